@@ -0,0 +1,204 @@
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+
+import pygame
+
+from metrics import METRICS, LatencyWindow
+
+PLAY_TIME = METRICS.histogram("sound_play", "Starting a clip on a mixer channel")
+FEEDBACK_TIME = METRICS.histogram("scan_to_sound", "Scan detected until its sound")
+
+SOUND_MAP = {
+    "Successfully scanned": "successfully-scanned.mp3",
+    "Please wait before scanning out": "pleasewait.mp3",
+    "Invalid scan": "invalid-scan.mp3",
+    "Attendance already completed for today": "attendance-completed.mp3",
+    "No active schedule for current time": "no-active-schedule.mp3",
+    "No schedule found for today": "no-schedule-found.mp3",
+    "Invalid station code": "invalid-station.mp3",
+}
+
+
+class AudioPlayer:
+    """Feedback clips decoded once up front and played on a pool of mixer channels"""
+
+    def __init__(self, sound_dir="sounds", channels=4, default_clip="error.mp3"):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        pygame.mixer.set_num_channels(channels)
+
+        self.sounds = {}
+        for name in sorted(os.listdir(sound_dir)):
+            if name.endswith((".mp3", ".wav", ".ogg")):
+                try:
+                    self.sounds[name] = pygame.mixer.Sound(
+                        os.path.join(sound_dir, name)
+                    )
+                except pygame.error as e:
+                    logging.error(f"Could not load sound {name}: {e}")
+
+        # Server message -> decoded clip, looked up once per scan
+        self.default_clip = self.sounds.get(default_clip)
+        self.clips = {
+            message: self.sounds[name]
+            for message, name in SOUND_MAP.items()
+            if name in self.sounds
+        }
+        self.latencies = LatencyWindow(FEEDBACK_TIME)
+
+    def play(self, message, scanned_at=None):
+        """Plays the clip for a server message, the default clip if none matches"""
+        return self.play_sound(self.clips.get(message, self.default_clip), scanned_at)
+
+    def play_file(self, name, scanned_at=None):
+        return self.play_sound(self.sounds.get(name), scanned_at)
+
+    def play_sound(self, sound, scanned_at=None):
+        if sound is None:
+            raise FileNotFoundError("Sound not loaded")
+        # Take a free channel, or the one that has been playing longest
+        started = time.perf_counter()
+        pygame.mixer.find_channel(True).play(sound)
+        PLAY_TIME.observe(time.perf_counter() - started)
+        if scanned_at is not None:
+            self.latencies.add(time.perf_counter() - scanned_at)
+        return True
+
+    def stats(self):
+        return {"played": len(self.latencies), **self.latencies.summary(digits=1)}
+
+
+class SpeechRenderer:
+    """Renders messages without a clip to WAV on a worker thread, once per text
+
+    Rendered files live in a size-bounded disk cache keyed by the text and voice
+    settings and are played through the same mixer channels as the clips.
+    """
+
+    def __init__(
+        self,
+        audio,
+        cache_dir="tts_cache",
+        disk_bytes=20 * 1024 * 1024,
+        rate=150,
+        volume=1.0,
+        voice=1,
+    ):
+        self.audio = audio
+        self.cache_dir = cache_dir
+        self.disk_bytes = disk_bytes
+        self.rate = rate
+        self.volume = volume
+        self.voice = voice
+        self.available = True
+        self.queue = queue.Queue()
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.cache_hits = 0
+        self.renders = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="tts", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def file_path(self, text):
+        key = f"{text}|{self.rate}|{self.volume}|{self.voice}"
+        return os.path.join(
+            self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".wav"
+        )
+
+    def speak(self, text, scanned_at=None):
+        """Plays the cached rendering of text, or queues it to be rendered first"""
+        if not self.available:
+            return False
+        path = self.file_path(text)
+        if os.path.exists(path):
+            self.cache_hits += 1
+            # Keeps recently spoken messages at the front of the eviction order
+            os.utime(path)
+            self.play(path, scanned_at)
+            return True
+        with self.lock:
+            if text in self.pending:
+                return True
+            self.pending.add(text)
+        self.queue.put((text, scanned_at))
+        return True
+
+    def play(self, path, scanned_at=None):
+        sound = self.audio.sounds.get(path)
+        if sound is None:
+            sound = self.audio.sounds[path] = pygame.mixer.Sound(path)
+        self.audio.play_sound(sound, scanned_at)
+
+    def run(self):
+        # pyttsx3 engines belong to the thread that created them
+        try:
+            import pyttsx3
+
+            engine = pyttsx3.init()
+            engine.setProperty("rate", self.rate)
+            engine.setProperty("volume", self.volume)
+            voices = engine.getProperty("voices")
+            if len(voices) > self.voice:
+                engine.setProperty("voice", voices[self.voice].id)
+        except Exception as e:
+            logging.error(f"TTS not available: {e}")
+            self.available = False
+            return
+
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            text, scanned_at = item
+            path = self.file_path(text)
+            try:
+                temp_path = f"{path}.tmp.wav"
+                engine.save_to_file(text, temp_path)
+                engine.runAndWait()
+                os.replace(temp_path, path)
+                self.renders += 1
+                self.prune()
+                self.play(path, scanned_at)
+            except Exception as e:
+                logging.error(f"TTS render failed for '{text}': {e}")
+            finally:
+                with self.lock:
+                    self.pending.discard(text)
+
+    def prune(self):
+        """Drops the least recently spoken files once the cache is over its size"""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".wav") and not name.endswith(".tmp.wav"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            path = os.path.join(self.cache_dir, name)
+            os.remove(path)
+            self.audio.sounds.pop(path, None)
+            total -= size
+
+    def stats(self):
+        return {
+            "available": self.available,
+            "cache_hits": self.cache_hits,
+            "renders": self.renders,
+            "pending": len(self.pending),
+        }
@@ -0,0 +1,72 @@
+"""Round-trip latency of HTTP and websocket scan submission against the stubs
+
+Starts stub_server's HTTP endpoint and Pusher stand-in in this process and
+sends the same number of scans one at a time over each transport, e.g.
+``python bench_transport.py --scans 200 --delay 5``.
+"""
+
+import argparse
+import threading
+import time
+import uuid
+
+from metrics import LatencyWindow
+from realtime import WebSocketClient
+from scanner import Scanner
+from socket_transport import SocketScanTransport
+import stub_server
+
+
+def bench(name, send, scans):
+    latencies = LatencyWindow(size=None)
+    for i in range(scans):
+        scan = (uuid.uuid4().hex, f"STU{i % 100:04d}", time.time())
+        started = time.perf_counter()
+        result = send(scan)
+        latencies.add(time.perf_counter() - started)
+        if result is None or result.get("retry"):
+            print(f"{name}: scan {i} failed: {result}")
+    print(f"{name:>9}: {scans} scans, {latencies.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scans", type=int, default=200)
+    parser.add_argument("--delay", type=int, default=0, help="server latency in ms")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ws-port", type=int, default=8766)
+    args = parser.parse_args()
+
+    server = stub_server.serve(args.port, delay=args.delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub_server.serve_pusher(args.ws_port, stub_server.StubHandler.state)
+
+    scanner = Scanner(f"http://127.0.0.1:{args.port}", "BENCH")
+    client = WebSocketClient(
+        {"host": "127.0.0.1", "port": args.ws_port, "key": "bench", "use_ssl": False},
+        channels=["private-scans"],
+    )
+    transport = SocketScanTransport(client, "BENCH")
+    client.start()
+    if not client.connected.wait(5):
+        raise SystemExit("Pusher stand-in did not accept the connection")
+
+    # One warm-up scan each so connection setup is not measured
+    scanner.process_scan("STU0000", scan_id=uuid.uuid4().hex)
+    transport.submit([(uuid.uuid4().hex, "STU0000", time.time())])
+
+    bench(
+        "http",
+        lambda scan: scanner.process_scan(
+            scan[1], scan_id=scan[0], captured_at=scan[2]
+        ),
+        args.scans,
+    )
+    bench("websocket", lambda scan: transport.submit([scan])[0], args.scans)
+
+    client.stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from metrics import LatencyWindow
+
+
+class CacheEvents:
+    """Applies events pushed on the attendance channel to the local caches
+
+    roster.updated carries the same students/removed delta as /api/roster,
+    photo.updated names a student whose photo changed and schedule.updated
+    triggers a delta roster refresh since the expected students follow the
+    schedule. Every (re)subscription also refreshes, to catch up on anything
+    pushed while the socket was down.
+    """
+
+    def __init__(self, roster, roster_sync=None, photo_cache=None, station_code=None):
+        self.roster = roster
+        self.roster_sync = roster_sync
+        self.photo_cache = photo_cache
+        self.station_code = station_code
+        self.handlers = {
+            "roster.updated": self.apply_roster,
+            "photo.updated": self.apply_photo,
+            "schedule.updated": self.apply_schedule,
+            "pusher_internal:subscription_succeeded": self.apply_resubscribe,
+        }
+        self.lock = threading.Lock()
+        self.applied = {}
+        self.ignored = 0
+        self.latencies = LatencyWindow()
+
+    def handle(self, event, channel, data):
+        """WebSocketClient listener, runs on the network thread"""
+        received_at = time.perf_counter()
+        handler = self.handlers.get(event)
+        if handler is None or not isinstance(data, dict):
+            self.ignored += 1
+            return
+        # Station specific events for another station are not ours to apply
+        station_code = data.get("station_code")
+        if station_code and station_code != self.station_code:
+            self.ignored += 1
+            return
+
+        handler(data)
+        with self.lock:
+            self.applied[event] = self.applied.get(event, 0) + 1
+            self.latencies.add(time.perf_counter() - received_at)
+
+    def apply_roster(self, data):
+        students = data.get("students", [])
+        # No server_time: only the delta fetch may move the sync cursor, a push
+        # landing before the post-reconnect refresh would skip missed changes
+        self.roster.apply(students, data.get("removed", []))
+        self.roster.save()
+        if self.photo_cache:
+            self.photo_cache.prefetch(
+                [student.get("photo_url") for student in students]
+            )
+
+    def apply_photo(self, data):
+        entry = self.roster.lookup(data.get("qr", ""))
+        old_url = entry["photo_url"] if entry else data.get("old_photo_url")
+        new_url = data.get("photo_url") or old_url
+        if entry:
+            self.roster.apply(
+                [
+                    {
+                        "qr": data["qr"],
+                        "name": entry["student_name"],
+                        "class": entry["class"],
+                        "photo_url": new_url,
+                    }
+                ]
+            )
+            self.roster.save()
+        if self.photo_cache:
+            # Same URL with new content is as stale as a replaced URL
+            for url in {old_url, new_url}:
+                if url:
+                    self.photo_cache.invalidate(url)
+            self.photo_cache.prefetch([new_url])
+
+    def apply_schedule(self, data):
+        if self.roster_sync:
+            self.roster_sync.refresh_now()
+
+    def apply_resubscribe(self, data):
+        if self.roster_sync:
+            self.roster_sync.refresh_now()
+
+    def stats(self):
+        with self.lock:
+            stats = {"applied": dict(self.applied), "ignored": self.ignored}
+            stats.update(self.latencies.summary(quantiles=(0.5,)))
+        return stats
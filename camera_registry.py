@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class CameraRegistry(QObject):
+    """Cameras found by probing OpenCV indices, enumerated in the background
+
+    The last result is kept in memory and on disk so Settings can list the
+    cameras at once, refresh() probes again and cameras_changed reports the
+    new list. Indices in use by a running lane are not opened again, their
+    previous entries are kept.
+    """
+
+    cameras_changed = pyqtSignal(list)
+
+    def __init__(self, path="camera_cache.json", max_index=10, max_gap=2):
+        super().__init__()
+        self.path = path
+        self.max_index = max_index
+        # Indices are handed out in order, a few missing in a row ends the probe
+        self.max_gap = max_gap
+        self.lock = threading.Lock()
+        self.thread = None
+        self.probes = 0
+        try:
+            with open(path, "r") as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.entries = []
+
+    def cameras(self):
+        with self.lock:
+            return list(self.entries)
+
+    def refresh(self, busy=()):
+        """Starts a probe in the background unless one is already running"""
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(
+                target=self.probe, args=(set(busy),), name="camera-probe", daemon=True
+            )
+            self.thread.start()
+
+    def probing(self):
+        """True while a probe has cameras open, scanning should not open them yet"""
+        thread = self.thread
+        return thread is not None and thread.is_alive()
+
+    def probe(self, busy):
+        import cv2
+
+        previous = {entry["index"]: entry for entry in self.cameras()}
+        entries = []
+        missing = 0
+        for index in range(self.max_index):
+            if index in busy:
+                if index in previous:
+                    entries.append(previous[index])
+                missing = 0
+                continue
+
+            cap = cv2.VideoCapture(index)
+            try:
+                if not cap.isOpened():
+                    missing += 1
+                    if missing >= self.max_gap:
+                        break
+                    continue
+                missing = 0
+                entries.append(self.describe(cv2, cap, index))
+            except Exception as e:
+                logging.error(f"Camera probe failed for index {index}: {e}")
+            finally:
+                cap.release()
+
+        self.probes += 1
+        with self.lock:
+            changed = entries != self.entries
+            self.entries = entries
+        if changed:
+            self.save()
+            logging.info(f"Cameras found: {entries}")
+        self.cameras_changed.emit(entries)
+
+    def describe(self, cv2, cap, index):
+        entry = {
+            "index": index,
+            "name": f"Camera {index}",
+            "backend": cap.getBackendName(),
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": round(cap.get(cv2.CAP_PROP_FPS), 1),
+        }
+        # Asking for an oversized frame makes the driver pick its largest mode
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 10000)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 10000)
+        entry["max_width"] = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        entry["max_height"] = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return entry
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(self.cameras(), f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.error(f"Could not save camera list: {e}")
+
+    def stats(self):
+        return {"cameras": len(self.entries), "probes": self.probes}
@@ -0,0 +1,244 @@
+import ctypes
+import os
+import sys
+import threading
+import time
+import logging
+
+import cv2
+import numpy as np
+
+from metrics import METRICS
+
+READ_TIME = METRICS.histogram("capture_read", "VideoCapture.read per frame")
+FRAMES_CAPTURED = METRICS.counter("frames_captured", "Frames read from cameras")
+FRAMES_DROPPED = METRICS.counter(
+    "frames_dropped", "Frames replaced before anyone picked them up"
+)
+
+
+def rss_bytes():
+    """Resident set size of this process, None where it cannot be read"""
+    try:
+        if sys.platform == "win32":
+
+            class Counters(ctypes.Structure):
+                _fields_ = [
+                    ("cb", ctypes.c_ulong),
+                    ("PageFaultCount", ctypes.c_ulong),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = Counters()
+            counters.cb = ctypes.sizeof(counters)
+            ctypes.windll.psapi.GetProcessMemoryInfo(
+                ctypes.windll.kernel32.GetCurrentProcess(),
+                ctypes.byref(counters),
+                counters.cb,
+            )
+            return counters.WorkingSetSize
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+
+class FramePool:
+    """Reusable frame buffers passed between the capture, decode and GUI threads
+
+    Every buffer handed out carries a reference count. Capture acquires one
+    to read into, the latest-frame slot and every reader hold a reference,
+    and a buffer goes back to the free list only once the last one is
+    released, so capture never overwrites a frame someone is still using.
+    """
+
+    def __init__(self, shape, size=4):
+        self.shape = shape
+        self.size = size
+        self.lock = threading.Lock()
+        self.free = [np.empty(shape, dtype=np.uint8) for _ in range(size)]
+        # id(buffer) -> [buffer, references]
+        self.refs = {}
+        self.allocations = size
+        self.reuses = 0
+        self.started = time.monotonic()
+
+    def acquire(self):
+        with self.lock:
+            if self.free:
+                buffer = self.free.pop()
+                self.reuses += 1
+            else:
+                # Every buffer is held, grow rather than make capture wait
+                buffer = np.empty(self.shape, dtype=np.uint8)
+                self.allocations += 1
+            self.refs[id(buffer)] = [buffer, 1]
+            return buffer
+
+    def adopt(self, frame, replaced):
+        """Takes over an array the driver allocated instead of filling ours"""
+        with self.lock:
+            self.refs.pop(id(replaced), None)
+            if frame.shape != self.shape:
+                logging.info(f"Frame size changed to {frame.shape}, resizing pool")
+                self.shape = frame.shape
+                self.free = []
+            self.refs[id(frame)] = [frame, 1]
+            self.allocations += 1
+        return frame
+
+    def hold(self, buffer):
+        with self.lock:
+            entry = self.refs.get(id(buffer))
+            if entry:
+                entry[1] += 1
+
+    def release(self, buffer):
+        with self.lock:
+            entry = self.refs.get(id(buffer))
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.refs[id(buffer)]
+                if buffer.shape == self.shape and len(self.free) < self.size:
+                    self.free.append(buffer)
+
+    def stats(self):
+        with self.lock:
+            minutes = max(time.monotonic() - self.started, 1) / 60
+            extra = self.allocations - self.size
+            return {
+                "pool_buffers": len(self.free) + len(self.refs),
+                "pool_held": len(self.refs),
+                "pool_reuses": self.reuses,
+                "extra_allocations": extra,
+                "allocations_per_minute": round(extra / minutes, 2),
+            }
+
+
+class FrameGrabber:
+    """Owns a cv2.VideoCapture on its own thread and keeps only the newest frame
+
+    Frames are read into pooled buffers. latest() hands the caller a reference,
+    which it gives back with release() once the frame is no longer needed.
+    """
+
+    def __init__(self, camera_id, pool_size=4):
+        self.camera_id = camera_id
+        self.camera = None
+        self.thread = None
+        self.running = False
+        self.condition = threading.Condition()
+        self.pool = None
+        self.pool_size = pool_size
+        self.frame = None
+        self.frame_id = 0
+        self.frame_time = 0
+        self.taken = True
+        self.captured_frames = 0
+        self.dropped_frames = 0
+
+    def open(self):
+        self.camera = cv2.VideoCapture(self.camera_id)
+        if not self.camera.isOpened():
+            return False
+        # Ask the driver not to queue frames, we only ever want the newest one
+        self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # Sized from the negotiated mode, the first frame corrects a wrong guess
+        width = int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH)) or 640
+        height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 480
+        self.pool = FramePool((height, width, 3), self.pool_size)
+        return True
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(
+            target=self.run, name=f"capture-{self.camera_id}", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+        if self.camera:
+            self.camera.release()
+            self.camera = None
+
+    def run(self):
+        while self.running:
+            buffer = self.pool.acquire()
+            started = time.perf_counter()
+            try:
+                ret, frame = self.camera.read(image=buffer)
+            except Exception as e:
+                logging.error(f"Camera read error: {e}")
+                ret = False
+            READ_TIME.observe(time.perf_counter() - started)
+
+            if not ret:
+                self.pool.release(buffer)
+                time.sleep(0.01)
+                continue
+            if frame is not buffer:
+                frame = self.pool.adopt(frame, buffer)
+
+            with self.condition:
+                # Overwrite the slot, a frame nobody picked up is simply dropped
+                if not self.taken:
+                    self.dropped_frames += 1
+                    FRAMES_DROPPED.inc()
+                previous = self.frame
+                self.frame = frame
+                self.frame_id += 1
+                self.frame_time = time.time()
+                self.taken = False
+                self.captured_frames += 1
+                self.condition.notify_all()
+            FRAMES_CAPTURED.inc()
+            # The slot's reference, readers that took the frame keep their own
+            if previous is not None:
+                self.pool.release(previous)
+
+    def latest(self, last_id=0):
+        """Returns (frame_id, frame), frame is None if nothing newer than last_id
+
+        A returned frame is held for the caller until it calls release(frame).
+        """
+        with self.condition:
+            if self.frame is None or self.frame_id == last_id:
+                return last_id, None
+            self.taken = True
+            self.pool.hold(self.frame)
+            return self.frame_id, self.frame
+
+    def wait(self, last_id=0, timeout=0.1):
+        """Blocks until a frame newer than last_id arrives or the timeout expires"""
+        with self.condition:
+            self.condition.wait_for(
+                lambda: not self.running or self.frame_id != last_id, timeout
+            )
+        return self.latest(last_id)
+
+    def release(self, frame):
+        self.pool.release(frame)
+
+    def stats(self):
+        stats = {
+            "captured_frames": self.captured_frames,
+            "dropped_frames": self.dropped_frames,
+        }
+        if self.pool:
+            stats.update(self.pool.stats())
+        return stats
@@ -0,0 +1,139 @@
+import logging
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from metrics import METRICS
+
+# Workers keep their own stage metrics, the GUI process sees the round trip
+POOL_DECODE_TIME = METRICS.histogram(
+    "decode_pool", "Frame copied to a worker until its codes come back"
+)
+
+
+def decode_worker(slot_names, decode_config, tasks, results):
+    """Runs the decode pipeline on frames placed in shared memory slots"""
+    from scanner import Scanner
+
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    # Only the decode pipeline is used, validation stays in the GUI process
+    scanner = Scanner(None, None)
+    scanner.configure_decode(decode_config)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            slot, frame_id, shape, brightness, contrast = task
+            codes = []
+            try:
+                frame = np.ndarray(shape, dtype=np.uint8, buffer=slots[slot].buf)
+                scanner.set_image_adjustments(brightness, contrast)
+                codes = scanner.read_frame_codes(frame)
+            except Exception as e:
+                logging.error(f"Decode worker error: {e}")
+            # Hands the slot back together with the result
+            results.put((slot, frame_id, codes))
+    finally:
+        for shm in slots:
+            shm.close()
+
+
+class DecodePool:
+    """Decodes frames in worker processes, frames travel through shared memory
+
+    Frames go to whichever worker is free, so no worker sees the whole stream.
+    The ROI tracker and motion gate carry state from frame to frame and are
+    turned off here, each worker would only see a share of the frames.
+    """
+
+    def __init__(self, frame_shape, workers=2, slots=None, decode_config=None):
+        self.decode_config = dict(
+            decode_config or {},
+            roi={"enabled": False},
+            motion_gate={"enabled": False},
+        )
+        self.frame_shape = tuple(frame_shape)
+        self.slot_size = int(np.prod(self.frame_shape))
+        self.workers = max(1, workers)
+        slot_count = slots or self.workers * 2
+        self.slots = [
+            shared_memory.SharedMemory(create=True, size=self.slot_size)
+            for _ in range(slot_count)
+        ]
+        self.free_slots = list(range(slot_count))
+        self.submitted_at = [0.0] * slot_count
+        self.tasks = mp.Queue()
+        self.results = mp.Queue()
+        self.processes = []
+        self.decoded_frames = 0
+        self.dropped_frames = 0
+
+    def start(self):
+        names = [shm.name for shm in self.slots]
+        for i in range(self.workers):
+            process = mp.Process(
+                target=decode_worker,
+                args=(names, self.decode_config, self.tasks, self.results),
+                name=f"decode-{i}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+
+    def submit(self, frame_id, frame, camera_config):
+        """Copies a frame into a free slot, drops it if every slot is busy"""
+        if frame.shape != self.frame_shape or not self.free_slots:
+            self.dropped_frames += 1
+            return False
+
+        slot = self.free_slots.pop()
+        view = np.ndarray(self.frame_shape, dtype=np.uint8, buffer=self.slots[slot].buf)
+        np.copyto(view, frame)
+        self.submitted_at[slot] = time.perf_counter()
+        self.tasks.put(
+            (
+                slot,
+                frame_id,
+                self.frame_shape,
+                camera_config["brightness"],
+                camera_config["contrast"],
+            )
+        )
+        return True
+
+    def poll(self):
+        """Returns (frame_id, codes) for every decode finished since the last call"""
+        finished = []
+        while True:
+            try:
+                slot, frame_id, codes = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.free_slots.append(slot)
+            POOL_DECODE_TIME.observe(time.perf_counter() - self.submitted_at[slot])
+            self.decoded_frames += 1
+            finished.append((frame_id, codes))
+        return finished
+
+    def stop(self):
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        for shm in self.slots:
+            shm.close()
+            shm.unlink()
+        self.slots = []
+
+    def stats(self):
+        return {
+            "decoded_frames": self.decoded_frames,
+            "dropped_frames": self.dropped_frames,
+        }
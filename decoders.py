@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import time
+
+import cv2
+
+try:
+    from pyzbar.pyzbar import decode, ZBarSymbol
+except ImportError:  # zbar DLLs missing, the OpenCV backends still work
+    decode = None
+
+
+def find_codes(gray):
+    """Returns (data, polygon) pairs for every QR code zbar finds in the image"""
+    return [
+        (code.data.decode("utf-8"), [(point.x, point.y) for point in code.polygon])
+        for code in decode(gray, symbols=[ZBarSymbol.QRCODE])  # Restrict to QR only
+    ]
+
+
+class ZbarDecoder:
+    name = "pyzbar"
+
+    def available(self):
+        return decode is not None
+
+    def decode(self, gray):
+        return find_codes(gray)
+
+
+class OpenCvDecoder:
+    name = "opencv"
+
+    def __init__(self):
+        self.detector = cv2.QRCodeDetector()
+
+    def available(self):
+        return True
+
+    def decode(self, gray):
+        data, points, _ = self.detector.detectAndDecode(gray)
+        if not data or points is None:
+            return []
+        return [(data, [(int(x), int(y)) for x, y in points.reshape(-1, 2)])]
+
+
+class OpenCvMultiDecoder(OpenCvDecoder):
+    name = "opencv-multi"
+
+    def decode(self, gray):
+        found, decoded, points, _ = self.detector.detectAndDecodeMulti(gray)
+        if not found or points is None:
+            return []
+        return [
+            (data, [(int(x), int(y)) for x, y in quad.reshape(-1, 2)])
+            for data, quad in zip(decoded, points)
+            if data
+        ]
+
+
+DECODERS = {
+    decoder.name: decoder
+    for decoder in (ZbarDecoder, OpenCvDecoder, OpenCvMultiDecoder)
+}
+
+
+def create_decoder(name):
+    decoder = DECODERS.get(name, ZbarDecoder)()
+    if not decoder.available():
+        logging.error(f"Decoder {name} not available, falling back to opencv")
+        decoder = OpenCvDecoder()
+    return decoder
+
+
+def load_samples(sample_dir="samples/qr"):
+    """Loads the bundled calibration images as (gray image, expected data) pairs"""
+    try:
+        with open(os.path.join(sample_dir, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError) as e:
+        logging.error(f"Decoder samples not available: {e}")
+        return []
+
+    samples = []
+    for entry in manifest:
+        image = cv2.imread(
+            os.path.join(sample_dir, entry["file"]), cv2.IMREAD_GRAYSCALE
+        )
+        if image is not None:
+            samples.append((image, entry["data"]))
+    return samples
+
+
+def calibrate(samples, min_accuracy=0.9, rounds=3, preprocess=None):
+    """Times every backend on the samples and picks the fastest accurate one
+
+    Returns (name, results) where results maps each backend name to its
+    measured ms/frame and accuracy.
+    """
+    results = {}
+    if preprocess:
+        samples = [(preprocess(image).copy(), data) for image, data in samples]
+
+    for name, decoder_class in DECODERS.items():
+        decoder = decoder_class()
+        if not decoder.available() or not samples:
+            continue
+
+        hits = 0
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for image, expected in samples:
+                codes = decoder.decode(image)
+                hits += any(data == expected for data, _ in codes)
+        elapsed = time.perf_counter() - started
+
+        attempts = rounds * len(samples)
+        results[name] = {
+            "ms": round(elapsed * 1000 / attempts, 2),
+            "accuracy": round(hits / attempts, 3),
+        }
+
+    accurate = [n for n, r in results.items() if r["accuracy"] >= min_accuracy]
+    if accurate:
+        return min(accurate, key=lambda n: results[n]["ms"]), results
+    if results:
+        # Nothing meets the bar, prefer the most accurate over the fastest
+        return max(results, key=lambda n: results[n]["accuracy"]), results
+    return ZbarDecoder.name, results
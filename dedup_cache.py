@@ -0,0 +1,46 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ScanDedupCache:
+    """Suppresses repeats of the same code while accepting other codes at once"""
+
+    def __init__(self, capacity=256, ttl=10.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def seen(self, key):
+        """Returns True if key was seen within the TTL, records it either way"""
+        now = time.monotonic()
+        with self.lock:
+            # Re-inserting moves the code to the recent end and restarts its TTL,
+            # so a card held in front of the camera is only submitted once
+            last_seen = self.entries.pop(key, None)
+            self.entries[key] = now
+            if last_seen is not None and now - last_seen < self.ttl:
+                self.hits += 1
+                return True
+
+            self.misses += 1
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            return False
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        return {
+            "dedup_hits": self.hits,
+            "dedup_misses": self.misses,
+            "dedup_evictions": self.evictions,
+            "dedup_size": len(self.entries),
+        }
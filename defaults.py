@@ -0,0 +1,83 @@
+import copy
+
+# The one set of defaults, config.json only has to hold what differs
+DEFAULT_CONFIG = {
+    "server_url": "",
+    "station_code": "",
+    "soketi": {
+        "host": "localhost",
+        "port": "6001",
+        "key": "",
+        "secret": "",
+        "app_id": "",
+    },
+    "camera": {"camera": "Camera 0", "brightness": 50, "contrast": 50},
+    "decode": {
+        "backend": "auto",
+        "calibration_accuracy": 0.9,
+        "mode": "thread",
+        "workers": 2,
+        "roi": {"enabled": True, "padding": 0.5, "full_scan_every": 15},
+        "scales": [0.5],
+        "min_scaled_size": 160,
+        # Off until tuned on site, a gate that misses a card means a missed scan
+        "motion_gate": {
+            "enabled": False,
+            "threshold": 12.0,
+            "min_cells": 2,
+            "hold_seconds": 1.0,
+        },
+    },
+    "station": {"lanes": []},
+    "dedup": {"capacity": 256, "ttl": 10},
+    "submission": {
+        "workers": 2,
+        "connect_timeout": 3,
+        "read_timeout": 10,
+        "retries": 2,
+        "batch_size": 1,
+        "batch_linger_ms": 50,
+        "transport": "http",
+        "socket_channel": "private-scans",
+        "ack_timeout_ms": 1500,
+    },
+    "journal": {
+        "path": "scan_journal.db",
+        "batch_size": 20,
+        "rate": 5,
+        "retry_interval": 10,
+        "keep_days": 7,
+    },
+    "roster": {
+        "enabled": True,
+        "path": "roster_cache.json",
+        "refresh_minutes": 15,
+    },
+    "photos": {
+        "cache_dir": "photo_cache",
+        "memory_items": 200,
+        "disk_mb": 50,
+        "prefetch": True,
+    },
+    "preview": {"fps": 15},
+    "metrics": {"enabled": True, "port": 9108, "overlay": False},
+    "tts": {
+        "cache_dir": "tts_cache",
+        "disk_mb": 20,
+        "rate": 150,
+        "volume": 1.0,
+        "voice": 1,
+    },
+    "timeout": 5,
+}
+
+
+def merge_defaults(config, defaults=DEFAULT_CONFIG):
+    """Copy of defaults with config laid over it, nested sections merged key by key"""
+    merged = copy.deepcopy(defaults)
+    for key, value in (config or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_defaults(value, merged[key])
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
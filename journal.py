@@ -0,0 +1,189 @@
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+
+class ScanJournal:
+    """Append-only SQLite journal of accepted scans, so none are lost offline
+
+    Rows move from "sending" (live submission in flight) to "sent", or to
+    "pending" when the server could not be reached, where the uploader picks
+    them up again.
+    """
+
+    def __init__(self, path="scan_journal.db"):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scans (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scan_id TEXT UNIQUE NOT NULL,
+                scan_data TEXT NOT NULL,
+                station_code TEXT,
+                captured_at REAL NOT NULL,
+                status TEXT NOT NULL DEFAULT 'sending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                sent_at REAL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS scans_status ON scans (status)")
+        # Anything still marked in flight was interrupted by a crash or shutdown
+        self.conn.execute(
+            "UPDATE scans SET status = 'pending' WHERE status = 'sending'"
+        )
+        self.conn.commit()
+
+    def append(self, scan_data, station_code, captured_at=None):
+        scan_id = uuid.uuid4().hex
+        with self.lock:
+            if self.conn is None:
+                return scan_id
+            self.conn.execute(
+                "INSERT INTO scans (scan_id, scan_data, station_code, captured_at) "
+                "VALUES (?, ?, ?, ?)",
+                (scan_id, scan_data, station_code, captured_at or time.time()),
+            )
+            self.conn.commit()
+        return scan_id
+
+    def mark_sent(self, scan_id):
+        with self.lock:
+            if self.conn is None:
+                return
+            self.conn.execute(
+                "UPDATE scans SET status = 'sent', sent_at = ?, "
+                "attempts = attempts + 1 WHERE scan_id = ?",
+                (time.time(), scan_id),
+            )
+            self.conn.commit()
+
+    def mark_pending(self, scan_id, error=None):
+        with self.lock:
+            if self.conn is None:
+                return
+            self.conn.execute(
+                "UPDATE scans SET status = 'pending', last_error = ?, "
+                "attempts = attempts + 1 WHERE scan_id = ?",
+                (error, scan_id),
+            )
+            self.conn.commit()
+
+    def pending(self, limit):
+        """Oldest scans waiting for the uploader, as (scan_id, data, station, time)"""
+        with self.lock:
+            if self.conn is None:
+                return []
+            return self.conn.execute(
+                "SELECT scan_id, scan_data, station_code, captured_at FROM scans "
+                "WHERE status = 'pending' ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def depth(self):
+        with self.lock:
+            if self.conn is None:
+                return 0
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM scans WHERE status != 'sent'"
+            ).fetchone()[0]
+
+    def prune(self, days=7):
+        with self.lock:
+            if self.conn is None:
+                return
+            self.conn.execute(
+                "DELETE FROM scans WHERE status = 'sent' AND sent_at < ?",
+                (time.time() - days * 86400,),
+            )
+            self.conn.commit()
+
+    def close(self):
+        """Later calls do nothing, a worker still finishing a post may make them
+
+        Rows such a worker could not update stay "sending" and are picked up
+        as pending on the next start.
+        """
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+class JournalUploader:
+    """Drains pending journal rows to the server once it is reachable again"""
+
+    def __init__(self, journal, scanner, batch_size=20, rate=5, retry_interval=10):
+        self.journal = journal
+        self.scanner = scanner
+        self.batch_size = batch_size
+        self.rate = rate
+        self.retry_interval = retry_interval
+        self.wake = threading.Event()
+        self.running = False
+        self.thread = None
+        self.uploaded = 0
+        self.sent_times = deque()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(
+            target=self.run, name="journal-upload", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def run(self):
+        while self.running:
+            try:
+                self.drain()
+            except Exception as e:
+                logging.error(f"Journal upload error: {e}")
+            self.wake.wait(self.retry_interval)
+            self.wake.clear()
+
+    def drain(self):
+        while self.running:
+            rows = self.journal.pending(self.batch_size)
+            if not rows:
+                return
+
+            for scan_id, scan_data, station_code, captured_at in rows:
+                if not self.running:
+                    return
+                result = self.scanner.process_scan(
+                    scan_data,
+                    scan_id=scan_id,
+                    captured_at=captured_at,
+                    station_code=station_code,
+                )
+                if result.get("retry"):
+                    # Still offline, leave the rest for the next attempt
+                    self.journal.mark_pending(scan_id, result.get("message"))
+                    return
+
+                self.journal.mark_sent(scan_id)
+                self.uploaded += 1
+                self.sent_times.append(time.time())
+                logging.info(f"Uploaded journaled scan {scan_data}: {result}")
+                time.sleep(1.0 / self.rate)
+
+    def drain_rate(self, window=60):
+        """Journaled scans uploaded per second over the last window seconds"""
+        cutoff = time.time() - window
+        while self.sent_times and self.sent_times[0] < cutoff:
+            self.sent_times.popleft()
+        return len(self.sent_times) / window
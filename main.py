@@ -1,32 +1,65 @@
 import sys
-import cv2
-import asyncio
-import websockets
+import time
+
+# Taken before any other import so the startup timeline covers them
+STARTUP_STARTED = time.perf_counter()
+
 import json
-import requests
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import QThread, pyqtSignal, QObject, QTimer, Qt, QDateTime
+from PyQt5.QtCore import (
+    QThread,
+    pyqtSignal,
+    pyqtSlot,
+    QObject,
+    QTimer,
+    Qt,
+    QDateTime,
+)
 from PyQt5.QtGui import *
-from scanner import Scanner
-import pygame
-import pyttsx3
+
+# cv2, pygame, requests and the modules built on them are imported where they
+# are first used, the window should not wait for them
+from roster import RosterIndex
+from camera_registry import CameraRegistry
+from startup import StartupTimeline
+from defaults import DEFAULT_CONFIG, merge_defaults
+from metrics import METRICS, MetricsServer
 import logging
 from datetime import datetime
 import os
-import ssl
-import hashlib
-import hmac
-import numpy as np
+import threading
+import multiprocessing
+
+TICK_TIME = METRICS.histogram("gui_tick", "All lanes handled in one timer tick")
+FRAME_AGE = METRICS.histogram("frame_age", "Frame captured until the GUI picked it up")
+HANDLE_TIME = METRICS.histogram(
+    "handle_scan", "Lookup, feedback and queueing of a scan"
+)
+DECODE_BUSY = METRICS.counter(
+    "frames_decode_busy", "Frames not decoded because a decode was running"
+)
+SCANS_DETECTED = METRICS.counter("scans_detected", "Codes accepted by a lane")
 
 
 # Settings section
 class SettingsDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, camera_registry=None):
         super().__init__(parent)
         self.setWindowTitle("Scanner Settings")
         self.setModal(True)
         self.resize(400, 500)
+        self.camera_registry = camera_registry
         self.setup_ui()
+        if camera_registry:
+            # The cached list shows at once, a running probe updates it later
+            self.set_cameras(camera_registry.cameras())
+            camera_registry.cameras_changed.connect(self.set_cameras)
+
+    def done(self, result):
+        # The registry outlives the dialog, a late probe must not reach it
+        if self.camera_registry:
+            self.camera_registry.cameras_changed.disconnect(self.set_cameras)
+        super().done(result)
 
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -67,9 +100,13 @@ class SettingsDialog(QDialog):
         camera_layout = QFormLayout()
 
         self.camera_select = QComboBox()
-        self.camera_select.addItems(
-            [f"Camera {i}" for i in range(self.count_cameras())]
-        )
+        self.camera_select.currentIndexChanged.connect(self.show_camera_info)
+        self.camera_info = QLabel()
+        self.refresh_cameras = QPushButton("Refresh")
+        self.refresh_cameras.clicked.connect(self.probe_cameras)
+        camera_row = QHBoxLayout()
+        camera_row.addWidget(self.camera_select, 1)
+        camera_row.addWidget(self.refresh_cameras)
 
         self.brightness = QSlider(Qt.Horizontal)
         self.brightness.setRange(0, 100)
@@ -84,9 +121,19 @@ class SettingsDialog(QDialog):
         self.timeout.setValue(5)
         self.timeout.setSuffix(" minutes")
 
-        camera_layout.addRow("Camera:", self.camera_select)
+        from decoders import DECODERS
+
+        self.decode_config = {}
+        self.decoder_select = QComboBox()
+        self.decoder_select.addItems(["auto"] + list(DECODERS))
+        self.decoder_info = QLabel("Not calibrated yet")
+
+        camera_layout.addRow("Camera:", camera_row)
+        camera_layout.addRow("", self.camera_info)
         camera_layout.addRow("Brightness:", self.brightness)
         camera_layout.addRow("Contrast:", self.contrast)
+        camera_layout.addRow("Decoder:", self.decoder_select)
+        camera_layout.addRow("", self.decoder_info)
         camera_layout.addRow("Auto-stop after:", self.timeout)
         camera_group.setLayout(camera_layout)
 
@@ -103,25 +150,39 @@ class SettingsDialog(QDialog):
         layout.addWidget(buttons)
         self.setLayout(layout)
 
-    def count_cameras(self):
-        max_cameras = 10
-        available = 0
-        for i in range(max_cameras):
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                available += 1
-                cap.release()
-        return available
-
-    def get_camera_names(self):
-        cameras = []
-        for i in range(10):
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                name = cap.getBackendName()
-                cameras.append(f"Camera {i} ({name})")
-                cap.release()
-        return cameras
+    def set_cameras(self, cameras):
+        selected = self.camera_select.currentText()
+        self.camera_select.blockSignals(True)
+        self.camera_select.clear()
+        for camera in cameras:
+            self.camera_select.addItem(camera["name"], camera)
+        self.camera_select.blockSignals(False)
+        self.select_camera(selected)
+
+    def select_camera(self, name):
+        if not name:
+            return
+        if self.camera_select.findText(name) < 0:
+            # Keep the configured camera even if the probe did not see it
+            self.camera_select.addItem(name, None)
+        self.camera_select.setCurrentText(name)
+        self.show_camera_info()
+
+    def show_camera_info(self, index=None):
+        camera = self.camera_select.currentData()
+        if not camera:
+            self.camera_info.setText("Not detected")
+            return
+        self.camera_info.setText(
+            f"{camera['backend']}, {camera['width']}x{camera['height']} "
+            f"at {camera['fps']:g} fps, up to {camera['max_width']}x"
+            f"{camera['max_height']}"
+        )
+
+    def probe_cameras(self):
+        if self.camera_registry:
+            self.camera_info.setText("Searching for cameras...")
+            self.camera_registry.refresh(busy=self.parent().busy_cameras())
 
     def load_settings(self, config):
         self.server_url.setText(config.get("server_url", ""))
@@ -139,11 +200,29 @@ class SettingsDialog(QDialog):
         camera_config = config.get("camera", {})
         if isinstance(camera, str):
             camera = {"camera": camera_config}
-        self.camera_select.setCurrentText(camera.get("camera", "Camera 0"))
+        self.select_camera(camera.get("camera", "Camera 0"))
         self.brightness.setValue(camera.get("brightness", 50))
         self.contrast.setValue(camera.get("contrast", 50))
         self.timeout.setValue(config.get("timeout", 5))
 
+        self.decode_config = dict(config.get("decode", {}))
+        self.decoder_select.setCurrentText(self.decode_config.get("backend", "pyzbar"))
+
+    def set_decoder_info(self, calibration):
+        if not calibration:
+            return
+        name, results = calibration
+        if name in results:
+            self.decoder_info.setText(f"Using {name} ({results[name]['ms']} ms/frame)")
+        else:
+            self.decoder_info.setText(f"Using {name} (no samples measured)")
+        self.decoder_info.setToolTip(
+            "\n".join(
+                f"{n}: {r['ms']} ms/frame, {r['accuracy']:.0%} read"
+                for n, r in results.items()
+            )
+        )
+
     def save_settings(self):
         return {
             "server_url": self.server_url.text(),
@@ -161,10 +240,19 @@ class SettingsDialog(QDialog):
                 "brightness": self.brightness.value(),
                 "contrast": self.contrast.value(),
             },
+            "decode": {
+                **self.decode_config,
+                "backend": self.decoder_select.currentText(),
+            },
             "timeout": self.timeout.value(),
         }
 
     def test_soketi_connection(self, event=None):
+        import asyncio
+        import ssl
+
+        import websockets
+
         try:
 
             async def test_connection():
@@ -221,142 +309,319 @@ class SettingsDialog(QDialog):
             QMessageBox.critical(self, "Error", f"Connection failed: {str(e)}")
 
 
-# Websocket section
-class WebSocketClient:
-    def __init__(self, soketi_config):
-        self.soketi_config = soketi_config
-        self.ws = None
-
-    async def connect(self, is_test=False):
-        """Establishes WebSocket connection using SSL or non-SSL based on config"""
-        protocol = "wss" if self.soketi_config.get("use_ssl", True) else "ws"
-        ws_url = f"{protocol}://{self.soketi_config['host']}:{self.soketi_config['port']}/app/{self.soketi_config['key']}"
+class FrameProcessor(QObject):
+    """Pulls the newest frame from a FrameGrabber and decodes it on its QThread
 
-        try:
-            if self.soketi_config.get("use_ssl", True):
-                ssl_context = ssl.create_default_context()
-                ssl_context.check_hostname = False
-                ssl_context.verify_mode = ssl.CERT_NONE
-                self.ws = await websockets.connect(
-                    ws_url, ssl=ssl_context, close_timeout=5, ping_timeout=5
-                )
-            else:
-                self.ws = await websockets.connect(
-                    ws_url, close_timeout=5, ping_timeout=5
-                )
+    Decoding runs at its own pace, frames captured while a decode is running
+    are never handed to it. The GUI timer only previews.
+    """
 
-            socket_id = await self.get_socket_id()
-            auth_signature = self.get_auth_signature(socket_id, "attendance")
-            await self.subscribe(auth_signature)
+    frame_processed = pyqtSignal(str, object)
 
-            if is_test:
-                return True
-            else:
-                await self.listen_messages()
+    def __init__(self, camera, scanner, camera_config):
+        super().__init__()
+        self.running = True
+        self.camera = camera
+        self.scanner = scanner
+        # Called per frame, so brightness/contrast changes apply at once
+        self.camera_config = camera_config
+        self.decoded_frames = 0
+        self.dropped_frames = 0
+
+    @pyqtSlot()
+    def run(self):
+        last_id = 0
+        while self.running:
+            frame_id, frame = self.camera.wait(last_id, timeout=0.1)
+            if frame is None:
+                continue
+            if last_id and frame_id - last_id > 1:
+                # Captured while the previous decode was running
+                self.dropped_frames += frame_id - last_id - 1
+                DECODE_BUSY.inc(frame_id - last_id - 1)
+            last_id = frame_id
+            try:
+                self.process_frame(frame)
+            finally:
+                self.camera.release(frame)
 
+    def process_frame(self, frame):
+        try:
+            camera_config = self.camera_config()
+            # Brightness/contrast are applied as a lookup table on the gray image
+            self.scanner.set_image_adjustments(
+                camera_config["brightness"], camera_config["contrast"]
+            )
+            scan_data, processed_frame = self.scanner.decode_frame(frame)
+            self.decoded_frames += 1
+            polygon = self.scanner.last_polygon if scan_data else None
+            if scan_data:
+                self.frame_processed.emit(scan_data, polygon)
         except Exception as e:
-            logging.error(f"WebSocket connection failed: {e}")
-            print(f"Connection error: {e}")
-            if is_test:
-                return False
-            await asyncio.sleep(5)
-            await self.connect()  # Retry connection
-
-    async def get_socket_id(self):
-        """Gets socket ID from connection response"""
-        message = await self.ws.recv()
-        data = json.loads(message)
-        if data.get("event") == "pusher:connection_established":
-            return json.loads(data["data"])["socket_id"]
-
-    def get_auth_signature(self, socket_id, channel):
-        """Generates auth signature for private channels"""
-        secret = self.soketi_config.get("secret", "")
-        string_to_sign = f"{socket_id}:{channel}"
-        signature = hmac.new(
-            secret.encode(), string_to_sign.encode(), hashlib.sha256
-        ).hexdigest()
-        return f"{self.soketi_config.get('key')}:{signature}"
-
-    async def subscribe(self, auth_signature):
-        subscribe_payload = {
-            "event": "pusher:subscribe",
-            "data": {
-                "channel": "attendance",
-                "auth": auth_signature,
-                "app_id": self.soketi_config.get("app_id"),
-                "app_secret": self.soketi_config.get("secret"),
-            },
+            logging.error(f"Frame processing error: {e}")
+
+    def stats(self):
+        return {
+            "decoded_frames": self.decoded_frames,
+            "dropped_frames": self.dropped_frames,
         }
-        await self.ws.send(json.dumps(subscribe_payload))
 
-    async def listen_messages(self):
-        """Listens for incoming messages"""
-        while True:
-            try:
-                message = await self.ws.recv()
-                data = json.loads(message)
-                if not data.get("event", "").startswith("client-"):
-                    logging.info(f"WebSocket message received: {message}")
-            except Exception as e:
-                logging.error(f"WebSocket error: {e}")
-                break
 
+class ScanLane(QObject):
+    """One camera with its own capture, decode pipeline and preview tile"""
 
-# Add preload
-import threading
+    scan_detected = pyqtSignal(str)
+
+    def __init__(
+        self,
+        name,
+        camera_config,
+        decode_config,
+        server_url,
+        station_code,
+        dedup,
+        preview_fps=15,
+    ):
+        super().__init__()
+        self.name = name
+        self.camera_config = camera_config
+        self.decode_config = decode_config
+        self.camera_id = int(camera_config.get("camera", "Camera 0").split()[-1])
+        from scanner import Scanner
+        from preview import PreviewRenderer
+
+        # Decoding only, scans are submitted through the app's shared Scanner
+        self.scanner = Scanner(server_url, station_code)
+        self.scanner.configure_decode(decode_config)
+        # Shared between lanes so one card is not accepted twice at a gate
+        self.scanner.dedup = dedup
+        self.camera = None
+        self.processor = None
+        self.process_thread = None
+        self.decode_pool = None
+        self.use_decode_pool = False
+        self.last_frame_id = 0
+        self.boundary = None
+        self.boundary_until = 0
+        self.preview = None
+        self.renderer = PreviewRenderer((1024, 480), fps=preview_fps)
+        self.caption = None
+        self.scans = 0
+        self.started_at = 0
+
+    def start(self):
+        from capture import FrameGrabber
+
+        self.camera = FrameGrabber(self.camera_id)
+        if not self.camera.open():
+            self.camera.stop()
+            self.camera = None
+            return False
+        self.camera.start()
+        self.last_frame_id = 0
+
+        # Process mode decodes in worker processes, the pool is sized on the first frame
+        self.use_decode_pool = self.decode_config.get("mode", "thread") == "process"
+        if not self.use_decode_pool:
+            self.process_thread = QThread()
+            self.processor = FrameProcessor(
+                self.camera, self.scanner, lambda: self.camera_config
+            )
+            self.processor.moveToThread(self.process_thread)
+            self.processor.frame_processed.connect(self.handle_processed)
+            self.process_thread.started.connect(self.processor.run)
+            self.process_thread.start()
 
+        self.scans = 0
+        self.started_at = time.time()
+        return True
+
+    def stop(self):
+        if self.processor:
+            self.processor.running = False
+            self.process_thread.quit()
+            self.process_thread.wait()
+        if self.decode_pool:
+            self.decode_pool.stop()
+        if self.camera:
+            self.camera.stop()
+        logging.info(f"{self.name} stats: {self.stats()}")
+        self.processor = None
+        self.process_thread = None
+        self.decode_pool = None
+        self.camera = None
 
-def preload():
-    import cv2
-    import PyQt5
+    def configure_decode(self, decode_config):
+        """Applies new decode settings to a running lane, mode changes need a restart"""
+        self.decode_config = decode_config
+        if self.decode_pool:
+            # Workers copy their settings at start, a new pool is sized on the next frame
+            self.decode_pool.stop()
+            self.decode_pool = None
+        else:
+            self.scanner.reconfigure_decode(decode_config)
 
+    def tick(self):
+        """Previews the newest frame, returns False if there was none
 
-threading.Thread(target=preload).start()
+        The decode thread pulls frames itself, only process mode is fed here.
+        """
+        if self.decode_pool:
+            self.collect_pool_results()
 
+        self.last_frame_id, frame = self.camera.latest(self.last_frame_id)
+        if frame is None:
+            return False
+        FRAME_AGE.observe(max(0.0, time.time() - self.camera.frame_time))
 
-class FrameProcessor(QObject):
-    frame_processed = pyqtSignal(np.ndarray, str)
+        try:
+            if self.use_decode_pool:
+                # Copied into shared memory, nothing to hand over
+                self.submit_to_pool(frame)
+            self.update_preview(frame)
+        finally:
+            self.camera.release(frame)
+        return True
+
+    def submit_to_pool(self, frame):
+        if self.decode_pool and self.decode_pool.frame_shape != frame.shape:
+            # The slots are sized for one resolution, the camera switched modes
+            logging.info(f"{self.name} frame size changed, rebuilding decode pool")
+            self.decode_pool.stop()
+            self.decode_pool = None
+        if self.decode_pool is None:
+            from decode_pool import DecodePool
+
+            workers = self.decode_config.get("workers", 2)
+            self.decode_pool = DecodePool(
+                frame.shape, workers=workers, decode_config=self.decode_config
+            )
+            self.decode_pool.start()
+        self.decode_pool.submit(self.last_frame_id, frame, self.camera_config)
 
-    def __init__(self):
-        super().__init__()
-        self.running = True
+    def collect_pool_results(self):
+        for frame_id, codes in self.decode_pool.poll():
+            scan_data = self.scanner.accept_codes(codes)
+            if scan_data:
+                self.handle_processed(scan_data, self.scanner.last_polygon)
 
-    def process_frame(self, frame, scanner, config):
-        if not self.running:
+    @pyqtSlot(str, object)
+    def handle_processed(self, scan_data, polygon):
+        if scan_data:
+            # Keep the code outlined on the live preview for a moment
+            self.boundary = polygon
+            self.boundary_until = time.time() + 0.5
+            self.scans += 1
+            self.update_caption()
+            self.scan_detected.emit(scan_data)
+
+    def update_preview(self, frame):
+        if not self.renderer.due():
             return
-        try:
-            # Apply brightness/contrast
-            frame = cv2.convertScaleAbs(
-                frame,
-                alpha=config["camera"]["contrast"] / 50.0,
-                beta=config["camera"]["brightness"],
+        boundary = None
+        if self.boundary is not None and time.time() < self.boundary_until:
+            boundary = self.boundary
+        self.renderer.render(frame, self.preview, boundary, self.scanner.draw_boundary)
+
+    def update_caption(self):
+        if self.caption:
+            stats = self.stats()
+            self.caption.setText(
+                f"{self.name}: {stats['scans']} scans ({stats['scans_per_minute']}/min)"
             )
-            scan_data, processed_frame = scanner.decode_frame(frame)
-            self.frame_processed.emit(processed_frame, scan_data if scan_data else "")
-        except Exception as e:
-            logging.error(f"Frame processing error: {e}")
+
+    def stats(self):
+        minutes = max(time.time() - self.started_at, 1) / 60
+        stats = {
+            "scans": self.scans,
+            "scans_per_minute": round(self.scans / minutes, 1),
+        }
+        if self.camera:
+            stats["capture"] = self.camera.stats()
+        if self.processor:
+            stats["decode"] = self.processor.stats()
+            stats["decode"].update(self.scanner.decode_stats())
+        if self.decode_pool:
+            stats["decode"] = self.decode_pool.stats()
+        stats["preview"] = self.renderer.stats()
+        return stats
 
 
 # Scanner App Section
 class ScannerApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, timeline=None):
         super().__init__()
+        self.timeline = timeline or StartupTimeline()
+        self.setup_logging()
         self.scanner = None
-        self.camera = None
+        self.lanes = []
+        self.lane_tiles = []
+        self.decoder_calibration = None
+        self.submitter = None
+        self.journal = None
+        self.uploader = None
+        self.roster = RosterIndex()
+        self.roster_sync = None
+        self.calibration_lock = threading.Lock()
+        self.realtime = None
+        self.cache_events = None
+        self.photo_cache = None
+        self.photo_url = None
+        self.rss_samples = []
+        # Stopped with the scanner, a quick restart must not inherit it
+        self.rss_timer = QTimer()
+        self.rss_timer.setSingleShot(True)
+        self.rss_timer.timeout.connect(self.sample_rss)
+        self.start_pending = False
+        self.metrics_server = None
+        # Probed in the background, Settings lists the cached result
+        self.camera_registry = CameraRegistry()
+        # Scans already acknowledged from the roster, waiting for the server
+        self.optimistic_scans = set()
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
+        self.journal_timer = QTimer()
+        self.journal_timer.timeout.connect(self.update_journal_status)
         self.inactivity_timer = QTimer()
         self.inactivity_timer.timeout.connect(self.handle_inactivity)
         self.last_activity_time = QDateTime.currentDateTime()
         self.last_scan_time = QDateTime.currentDateTime()
-        # self.tts_engine = pyttsx3.init()
-        pygame.mixer.init()
-        self.setup_audio()
+        # Audio loads in the background once the window is up
+        self.audio = None
+        self.speech = None
+        # perf_counter() of each scan still waiting for its feedback sound
+        self.scan_times = {}
         self.load_config()
+        self.timeline.mark("config")
         self.init_ui()
-        self.setup_logging()
         self.set_status_message("Ready", "info")
+        self.timeline.mark("ui")
+
+    def finish_startup(self):
+        """Runs from the event loop once the window is shown"""
+        self.timeline.mark("event loop")
+        # Probed from the GUI thread so it cannot race Start, which waits for it
+        self.camera_registry.refresh(busy=self.busy_cameras())
+        threading.Thread(target=self.warm_up, name="warm-up", daemon=True).start()
+
+    def warm_up(self):
+        """Loads the heavy subsystems behind the visible window"""
+        try:
+            with self.timeline.timed("audio"):
+                self.setup_audio()
+            # Imported only to have them loaded before Start needs them
+            with self.timeline.timed("camera and decode"):
+                import scanner, capture, decode_pool, preview
+
+                if self.config.get("decode", {}).get("backend") == "auto":
+                    self.calibrate_decoders(self.config["decode"])
+            with self.timeline.timed("networking"):
+                import submission, journal, photo_cache, realtime
+
+                self.start_metrics()
+        except Exception as e:
+            logging.error(f"Background startup failed: {e}")
+        self.timeline.log()
 
     def init_ui(self):
         self.setWindowTitle("TrillED Attendance Scanner")
@@ -403,6 +668,9 @@ class ScannerApp(QMainWindow):
         """
         )
         preview_layout.addWidget(self.preview, alignment=Qt.AlignCenter)
+        # Station mode puts one tile per lane here instead of the single preview
+        self.lane_layout = QHBoxLayout()
+        preview_layout.addLayout(self.lane_layout)
         preview_group.setLayout(preview_layout)
         layout.addWidget(preview_group)
 
@@ -448,8 +716,49 @@ class ScannerApp(QMainWindow):
         """
         )
         self.setStatusBar(status_bar)
+        self.journal_label = QLabel()
+        status_bar.addPermanentWidget(self.journal_label)
         self.set_status_message("Ready", "info")
 
+        # Stage latencies over the preview, toggled with F12
+        self.diagnostics = QLabel(self)
+        self.diagnostics.setStyleSheet(
+            """
+            background-color: rgba(0, 0, 0, 170);
+            color: #ffffff;
+            font-family: monospace;
+            font-size: 9pt;
+            padding: 6px;
+        """
+        )
+        self.diagnostics.move(30, 45)
+        self.diagnostics.hide()
+        self.diagnostics_timer = QTimer()
+        self.diagnostics_timer.timeout.connect(self.update_diagnostics)
+        QShortcut(QKeySequence("F12"), self, self.toggle_diagnostics)
+        if self.config.get("metrics", {}).get("overlay", False):
+            self.toggle_diagnostics()
+
+    def toggle_diagnostics(self):
+        if self.diagnostics.isVisible():
+            self.diagnostics_timer.stop()
+            self.diagnostics.hide()
+            return
+        self.update_diagnostics()
+        self.diagnostics.show()
+        self.diagnostics.raise_()
+        self.diagnostics_timer.start(1000)
+
+    def update_diagnostics(self):
+        self.diagnostics.setText("\n".join(METRICS.summary()) or "No samples yet")
+        self.diagnostics.adjustSize()
+
+    def start_metrics(self):
+        metrics_config = self.config.get("metrics", {})
+        if metrics_config.get("enabled", True):
+            self.metrics_server = MetricsServer(metrics_config.get("port", 9108))
+            self.metrics_server.start()
+
     def set_status_message(self, message, status_type="info"):
         colors = {"success": "#28a745", "error": "#dc3545", "info": "#17a2b8"}
         style = f"""
@@ -469,57 +778,60 @@ class ScannerApp(QMainWindow):
     def load_config(self):
         try:
             with open("config.json", "r") as f:
-                self.config = json.load(f)
+                # Sections and keys added since the file was written get defaults
+                self.config = merge_defaults(json.load(f))
         except FileNotFoundError:
             self.config = self.get_default_config()
 
     def get_default_config(self):
-        return {
-            "server_url": "",
-            "station_code": "",
-            "soketi": {
-                "host": "localhost",
-                "port": "6001",
-                "key": "",
-                "secret": "",
-                "app_id": "",
-            },
-            "camera": {"camera": "Camera 0", "brightness": 50, "contrast": 50},
-            "timeout": 5,
-        }
+        return merge_defaults({})
 
     def save_config(self):
         with open("config.json", "w") as f:
             json.dump(self.config, f)
 
     def show_settings(self):
-        dialog = SettingsDialog(self)
+        dialog = SettingsDialog(self, self.camera_registry)
         dialog.load_settings(self.config)
+        dialog.set_decoder_info(self.decoder_calibration)
         if dialog.exec_() == QDialog.Accepted:
-            self.config = dialog.save_settings()
+            # Keep sections the dialog does not edit, e.g. "decode"
+            self.config.update(dialog.save_settings())
             self.save_config()
             self.apply_settings()
 
     def apply_settings(self):
         if self.scanner:
             self.scanner.update_config(self.config)
+        decode_config = self.resolve_decode_config() if self.lanes else None
+        for lane, camera_config in zip(self.lanes, self.get_lane_configs()):
+            lane.camera_config = camera_config
+            lane.configure_decode(decode_config)
         self.inactivity_timer.setInterval(self.config["timeout"] * 60 * 1000)
 
     def setup_audio(self):
-        self.use_tts = True
-        try:
-            self.tts_engine = pyttsx3.init()
-            self.tts_engine.setProperty("rate", 150)
-            self.tts_engine.setProperty("volume", 1.0)
-            voices = self.tts_engine.getProperty("voices")
-            if len(voices) > 1:
-                self.tts_engine.setProperty("voice", voices[1].id)
-        except:
-            self.use_tts = False
-            print("TTS not available, falling back to audio files")
+        from audio import AudioPlayer, SpeechRenderer
+
+        audio = AudioPlayer()
+        tts_config = self.config.get("tts", {})
+        speech = SpeechRenderer(
+            audio,
+            tts_config.get("cache_dir", "tts_cache"),
+            disk_bytes=tts_config.get("disk_mb", 20) * 1024 * 1024,
+            rate=tts_config.get("rate", 150),
+            volume=tts_config.get("volume", 1.0),
+            voice=tts_config.get("voice", 1),
+        )
+        speech.start()
+        self.audio, self.speech = audio, speech
 
     def setup_logging(self):
-        log_dir = "logs"
+        if getattr(sys, "frozen", False):
+            # Running as compiled exe
+            log_dir = os.path.join(os.path.dirname(sys.executable), "logs")
+        else:
+            # Running as script
+            log_dir = "logs"
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
 
@@ -544,14 +856,6 @@ class ScannerApp(QMainWindow):
             ).days > days:
                 os.remove(file_path)
 
-    def setup_logging(self):
-        if getattr(sys, "frozen", False):
-            # Running as compiled exe
-            log_dir = os.path.join(os.path.dirname(sys.executable), "logs")
-        else:
-            # Running as script
-            log_dir = "logs"
-
     def handle_exception(exc_type, exc_value, exc_traceback):
         logging.error(
             "Uncaught exception", exc_info=(exc_type, exc_value, exc_traceback)
@@ -560,44 +864,298 @@ class ScannerApp(QMainWindow):
 
     sys.excepthook = handle_exception
 
-    def start_scanner(self):
-        camera_config = self.config.get("camera", {})
-        camera_id = int(camera_config.get("camera", "Camera 0").split()[-1])
+    def busy_cameras(self):
+        return {lane.camera_id for lane in self.lanes}
+
+    def get_lane_configs(self):
+        """Camera settings per lane, a plain station has just the one camera"""
+        lanes = self.config.get("station", {}).get("lanes")
+        # Lanes may list only their camera, brightness and contrast get defaults
+        return [
+            merge_defaults(lane, DEFAULT_CONFIG["camera"])
+            for lane in lanes or [self.config.get("camera", {})]
+        ]
+
+    def resolve_decode_config(self):
+        """Decode settings with an "auto" backend replaced by the calibrated one"""
+        decode_config = dict(self.config.get("decode", {}))
+        if decode_config["backend"] == "auto":
+            if self.decoder_calibration is None:
+                self.calibrate_decoders(decode_config)
+            decode_config["backend"] = self.decoder_calibration[0]
+        return decode_config
+
+    def calibrate_decoders(self, decode_config):
+        from decoders import calibrate, load_samples
+        from preprocess import FramePreprocessor
+
+        # Start may ask while the background warm-up is already calibrating
+        with self.calibration_lock:
+            if self.decoder_calibration is not None:
+                return
+            name, results = calibrate(
+                load_samples(),
+                min_accuracy=decode_config.get("calibration_accuracy", 0.9),
+                preprocess=FramePreprocessor().equalize,
+            )
+            logging.info(f"Decoder calibration: {results}, using {name}")
+            self.decoder_calibration = (name, results)
 
-        self.camera = cv2.VideoCapture(camera_id)
-        if not self.camera.isOpened():
-            QMessageBox.critical(self, "Error", "Could not open camera")
+    def start_scanner(self):
+        # Two opens of one device at once can fail, so a running probe goes
+        # first. The GUI keeps running meanwhile, probing takes seconds.
+        if self.camera_registry.probing():
+            if not self.start_pending:
+                self.start_pending = True
+                self.start_button.setEnabled(False)
+                self.statusBar().showMessage("Starting cameras...")
+            QTimer.singleShot(200, self.resume_start)
             return
+        self.start_pending = False
+
+        from scanner import Scanner
+        from dedup_cache import ScanDedupCache
+        from submission import ScanSubmitter
+        from journal import ScanJournal, JournalUploader
+        from roster import RosterSync
+        from photo_cache import PhotoCache
+        from realtime import WebSocketClient
+        from cache_events import CacheEvents
+        from socket_transport import SocketScanTransport
+        from capture import rss_bytes
+
+        # Steady state is measured from a sample taken once the pools have filled
+        self.rss_samples = [(time.time(), rss_bytes())]
+        self.rss_timer.start(10000)
+
+        decode_config = self.resolve_decode_config()
+        dedup_config = self.config.get("dedup", {})
+        self.dedup = ScanDedupCache(
+            capacity=dedup_config.get("capacity", 256),
+            ttl=dedup_config.get("ttl", 10),
+        )
+        lane_configs = self.get_lane_configs()
+        for i, camera_config in enumerate(lane_configs):
+            lane = ScanLane(
+                f"Lane {i + 1}",
+                camera_config,
+                decode_config,
+                self.config["server_url"],
+                self.config["station_code"],
+                self.dedup,
+                preview_fps=self.config.get("preview", {}).get("fps", 15),
+            )
+            if not lane.start():
+                for started in self.lanes:
+                    started.stop()
+                self.lanes = []
+                # A camera that will not open may have been unplugged or renumbered
+                self.camera_registry.refresh()
+                self.start_button.setEnabled(True)
+                self.statusBar().showMessage("Scanner stopped")
+                QMessageBox.critical(
+                    self, "Error", f"Could not open {camera_config.get('camera')}"
+                )
+                return
+            lane.scan_detected.connect(self.handle_scan)
+            self.lanes.append(lane)
+        self.setup_lane_tiles()
 
         self.scanner = Scanner(self.config["server_url"], self.config["station_code"])
-        self.scanner.soketi_config = self.config.get("soketi", {})
-
-        # Initialize WebSocket
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(self.scanner.init_websocket())
+        submission_config = self.config.get("submission", {})
+        self.scanner.configure_submission(submission_config)
+
+        # The connection lives on its own thread, Start does not wait for it
+        soketi = self.config.get("soketi", {})
+        transport = None
+        if soketi.get("host") and soketi.get("key"):
+            channels = ["attendance"]
+            if submission_config.get("transport") == "websocket":
+                channels.append(
+                    submission_config.get("socket_channel", "private-scans")
+                )
+            self.realtime = WebSocketClient(soketi, channels=channels)
+            if len(channels) > 1:
+                transport = SocketScanTransport(
+                    self.realtime,
+                    self.config["station_code"],
+                    channel=channels[1],
+                    ack_timeout=submission_config.get("ack_timeout_ms", 1500) / 1000,
+                )
 
-        # Setup frame processing thread
-        self.process_thread = QThread()
-        self.processor = FrameProcessor()
-        self.processor.moveToThread(self.process_thread)
-        self.processor.frame_processed.connect(self.update_preview)
-        self.process_thread.start()
+        # Every accepted scan is journaled first, the uploader sends what the
+        # live submission could not
+        journal_config = self.config.get("journal", {})
+        self.journal = ScanJournal(journal_config.get("path", "scan_journal.db"))
+        self.journal.prune(days=journal_config.get("keep_days", 7))
+        self.uploader = JournalUploader(
+            self.journal,
+            self.scanner,
+            batch_size=journal_config.get("batch_size", 20),
+            rate=journal_config.get("rate", 5),
+            retry_interval=journal_config.get("retry_interval", 10),
+        )
+        self.uploader.start()
+
+        self.submitter = ScanSubmitter(
+            self.scanner,
+            self.journal,
+            workers=submission_config.get("workers", 2),
+            batch_size=submission_config.get("batch_size", 1),
+            batch_linger=submission_config.get("batch_linger_ms", 50) / 1000,
+            transport=transport,
+        )
+        self.submitter.result_ready.connect(self.handle_scan_result)
+        self.submitter.start()
+
+        if self.photo_cache is None:
+            photo_config = self.config.get("photos", {})
+            self.photo_cache = PhotoCache(
+                photo_config.get("cache_dir", "photo_cache"),
+                memory_items=photo_config.get("memory_items", 200),
+                disk_bytes=photo_config.get("disk_mb", 50) * 1024 * 1024,
+            )
+            self.photo_cache.photo_ready.connect(self.show_student_photo)
+
+        roster_config = self.config.get("roster", {})
+        if roster_config.get("enabled", True):
+            self.roster = RosterIndex(roster_config.get("path", "roster_cache.json"))
+            self.roster.load(self.config["station_code"])
+            self.roster_sync = RosterSync(
+                self.roster,
+                self.scanner,
+                interval=roster_config.get("refresh_minutes", 15) * 60,
+                on_refresh=self.prefetch_photos,
+                live=self.realtime.connected if self.realtime else None,
+            )
+            self.roster_sync.start()
+        self.journal_timer.start(1000)
+
+        if self.realtime:
+            if self.roster_sync:
+                # Server-pushed changes update the roster and photo caches in place
+                self.cache_events = CacheEvents(
+                    self.roster,
+                    self.roster_sync,
+                    self.photo_cache,
+                    self.config["station_code"],
+                )
+                self.realtime.add_listener(self.cache_events.handle)
+            self.realtime.start()
 
-        self.timer.start(30)
+        # Capture runs on its own thread, the timer only picks up the newest frame
+        self.timer.start(10)
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
         self.statusBar().showMessage("Scanner running")
         self.last_activity_time = QDateTime.currentDateTime()
 
+    def resume_start(self):
+        """Carries on with a Start that was waiting for the camera probe"""
+        if self.start_pending:
+            self.start_scanner()
+
+    def setup_lane_tiles(self):
+        if len(self.lanes) == 1:
+            self.lanes[0].preview = self.preview
+            return
+
+        self.preview.hide()
+        tile_width = 1024 // len(self.lanes) - 10
+        for lane in self.lanes:
+            tile = QWidget()
+            tile_layout = QVBoxLayout(tile)
+            lane.preview = QLabel()
+            lane.preview.setFixedSize(tile_width, 450)
+            lane.preview.setAlignment(Qt.AlignCenter)
+            lane.preview.setStyleSheet(
+                """
+                background-color: #f0f0f0;
+                border: 1px solid #ddd;
+                border-radius: 4px;
+            """
+            )
+            lane.renderer.size = (tile_width, 450)
+            lane.caption = QLabel()
+            lane.caption.setAlignment(Qt.AlignCenter)
+            lane.update_caption()
+            tile_layout.addWidget(lane.preview)
+            tile_layout.addWidget(lane.caption)
+            self.lane_layout.addWidget(tile)
+            self.lane_tiles.append(tile)
+
+    def clear_lane_tiles(self):
+        for tile in self.lane_tiles:
+            self.lane_layout.removeWidget(tile)
+            tile.deleteLater()
+        self.lane_tiles = []
+        self.preview.show()
+
+    def sample_rss(self):
+        from capture import rss_bytes
+
+        if self.lanes and len(self.rss_samples) == 1:
+            self.rss_samples.append((time.time(), rss_bytes()))
+
+    def log_rss(self):
+        from capture import rss_bytes
+
+        samples = self.rss_samples + [(time.time(), rss_bytes())]
+        if any(rss is None for _, rss in samples):
+            return
+        text = ", ".join(f"{rss / 2**20:.1f} MB" for _, rss in samples)
+        if len(samples) < 3:
+            # Stopped before the pools filled, there is no steady state to report
+            logging.info(f"RSS at start/stop: {text}")
+            return
+        (warm_time, warm_rss), (end_time, end_rss) = samples[1], samples[2]
+        minutes = max(end_time - warm_time, 1) / 60
+        logging.info(
+            f"RSS at start/steady/stop: {text}, "
+            f"{(end_rss - warm_rss) / 2**20 / minutes:+.2f} MB/min in steady state"
+        )
+
     def stop_scanner(self):
-        if hasattr(self, "processor"):
-            self.processor.running = False
-            self.process_thread.quit()
-            self.process_thread.wait()
+        self.start_pending = False
         self.timer.stop()
-        if self.camera:
-            self.camera.release()
+        self.rss_timer.stop()
+        for lane in self.lanes:
+            lane.stop()
+        if self.lanes:
+            logging.info(f"Dedup stats: {self.dedup.stats()}")
+            self.log_rss()
+        if self.lanes:
+            logging.info(f"Stage latency: {'; '.join(METRICS.summary())}")
+        if self.lanes and self.audio:
+            logging.info(f"Feedback latency: {self.audio.stats()}")
+            logging.info(f"TTS stats: {self.speech.stats()}")
+        self.lanes = []
+        if self.submitter:
+            self.submitter.stop()
+            logging.info(f"Submission stats: {self.submitter.stats()}")
+            if self.submitter.transport:
+                logging.info(f"Socket transport: {self.submitter.transport.stats()}")
+            self.submitter = None
+        if self.realtime:
+            self.realtime.stop()
+            logging.info(f"WebSocket stats: {self.realtime.stats()}")
+            if self.cache_events:
+                logging.info(f"Cache event stats: {self.cache_events.stats()}")
+                self.cache_events = None
+            self.realtime = None
+        if self.roster_sync:
+            self.roster_sync.stop()
+            self.roster_sync = None
+        self.optimistic_scans.clear()
+        if self.uploader:
+            self.uploader.stop()
+            self.uploader = None
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        self.journal_timer.stop()
+        self.journal_label.clear()
+        self.clear_lane_tiles()
         self.clear_preview()
         self.reset_display()
         self.start_button.setEnabled(True)
@@ -606,6 +1164,7 @@ class ScannerApp(QMainWindow):
 
     def reset_display(self):
         self.student_info.setText("No scan yet")
+        self.photo_url = None
         self.set_default_photo()
 
     def clear_preview(self):
@@ -614,34 +1173,25 @@ class ScannerApp(QMainWindow):
         self.preview.setPixmap(QPixmap.fromImage(empty_image))
 
     def handle_inactivity(self):
-        if self.camera and (
+        if self.lanes and (
             QDateTime.currentDateTime().secsTo(self.last_activity_time) > 300
         ):
             self.stop_scanner()
             self.statusBar().showMessage("Scanner stopped due to inactivity")
 
     def update_frame(self):
-        ret, frame = self.camera.read()
-        if ret:
-            self.processor.process_frame(frame, self.scanner, self.config)
-
+        started = time.perf_counter()
+        new_frame = False
+        for lane in self.lanes:
+            new_frame = lane.tick() or new_frame
+        if new_frame:
+            TICK_TIME.observe(time.perf_counter() - started)
+
+        if new_frame:
             # Clear info if no barcode detected for 5 seconds
             if QDateTime.currentDateTime().secsTo(self.last_scan_time) > 5:
                 self.reset_display()
 
-    def update_preview(self, frame, scan_data):
-        if scan_data:
-            self.handle_scan(scan_data)
-
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        bytes_per_line = ch * w
-        image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        scaled_image = image.scaled(
-            1024, 480, Qt.KeepAspectRatio, Qt.SmoothTransformation
-        )
-        self.preview.setPixmap(QPixmap.fromImage(scaled_image))
-
     def set_status_message(self, message, status_type="info"):
         colors = {"success": "#28a745", "error": "#dc3545", "info": "#17a2b8"}
         style = f"QStatusBar {{ color: {colors[status_type]}; font-weight: bold; }}"
@@ -649,50 +1199,86 @@ class ScannerApp(QMainWindow):
         self.statusBar().showMessage(message)
 
     def handle_scan(self, scan_data):
-        self.last_scan_time = QDateTime.currentDateTime()
-        result = self.scanner.process_scan(scan_data)
+        SCANS_DETECTED.inc()
+        with HANDLE_TIME.time():
+            self.accept_scan(scan_data)
 
-        if result["status"] == "success":
+    def accept_scan(self, scan_data):
+        self.last_scan_time = QDateTime.currentDateTime()
+        self.scan_times[scan_data] = time.perf_counter()
+        student = self.roster.lookup(scan_data)
+        if student:
+            # Acknowledge straight away, the server result reconciles it later
+            self.optimistic_scans.add(scan_data)
+            self.show_expected_student(student)
+            self.speak_message("Successfully scanned", scan_data)
+
+        # Scanning carries on while the submission is in flight
+        if not self.submitter.submit(scan_data):
+            self.set_status_message("Scan saved, will send shortly", "info")
+
+    def update_journal_status(self):
+        if not self.journal:
+            return
+        depth = self.journal.depth()
+        if depth:
+            self.journal_label.setText(
+                f"Unsent: {depth} ({self.uploader.drain_rate():.1f}/s)"
+            )
+        else:
+            self.journal_label.setText("All scans sent")
+
+    def handle_scan_result(self, scan_data, result):
+        acknowledged = scan_data in self.optimistic_scans
+        self.optimistic_scans.discard(scan_data)
+
+        if result.get("retry"):
+            # Saved in the journal, the uploader sends it once the server is back
+            self.set_status_message("Scan saved, will send when online", "info")
+            if not acknowledged:
+                self.play_success_sound(scan_data)
+        elif result["status"] == "success":
             self.set_status_message("Scan successful", "success")
-            self.speak_message("Successfully scanned")
+            if not acknowledged:
+                self.speak_message("Successfully scanned", scan_data)
             self.update_student_info(result["data"])
         else:
             message = result.get("message", "Unknown error")
             self.set_status_message(f"Error: {message}", "error")
-            self.speak_message(message)
-
-    def speak_message(self, message):
-        # Prefer sound files over TTS
+            self.speak_message(message, scan_data)
+        self.scan_times.pop(scan_data, None)
+
+    def speak_message(self, message, scan_data=None):
+        # Prefer recorded clips, then cached TTS, then the generic error clip
+        scanned_at = self.scan_times.pop(scan_data, None)
+        if self.audio is None:
+            # Still loading in the background
+            return
         try:
-            self.play_status_sound(message)
+            if message in self.audio.clips or not self.speech.speak(
+                message, scanned_at
+            ):
+                self.play_status_sound(message, scanned_at)
         except Exception as e:
             logging.error(f"Sound error: {e}")
-            if self.use_tts:
-                self._speak_async(message)
-
-    def _speak_async(self, message):
-        self.tts_engine.say(message)
-        self.tts_engine.runAndWait()
-
-    def play_status_sound(self, message):
-        sound_map = {
-            "Successfully scanned": "successfully-scanned.mp3",
-            "Please wait before scanning out": "pleasewait.mp3",
-            "Invalid scan": "invalid-scan.mp3",
-            "Attendance already completed for today": "attendance-completed.mp3",
-            "No active schedule for current time": "no-active-schedule.mp3",
-            "No schedule found for today": "no-schedule-found.mp3",
-            "Invalid station code": "invalid-station.mp3",
-        }
+
+    def play_status_sound(self, message, scanned_at=None):
         try:
-            sound_file = sound_map.get(message, "error.mp3")
-            if not os.path.exists(f"sounds/{sound_file}"):
-                raise FileNotFoundError(f"Sound file not found: {sound_file}")
-            pygame.mixer.music.load(f"sounds/{sound_file}")
-            pygame.mixer.music.play()
+            self.audio.play(message, scanned_at)
         except Exception as e:
             raise Exception(f"Sound playback failed: {e}")
 
+    def show_expected_student(self, student):
+        info_text = f"""
+        <div style='font-size: 12pt;'>
+            <p><b>Name:</b> {student['student_name']}</p>
+            <p><b>Class:</b> {student['class']}</p>
+            <p><b>Status:</b> <span style='color: gray;'>Checking...</span></p>
+        </div>
+        """
+        self.student_info.setText(info_text)
+        self.load_student_photo(student.get("photo_url"))
+
     def update_student_info(self, data):
         status_style = {
             "P": "color: green; font-weight: bold; font-size: 16pt;",
@@ -713,53 +1299,69 @@ class ScannerApp(QMainWindow):
         self.student_info.setText(info_text)
         self.load_student_photo(data.get("photo_url"))
 
+    def prefetch_photos(self):
+        # Runs on the roster thread, the cache only queues the downloads
+        if self.config.get("photos", {}).get("prefetch", True):
+            self.photo_cache.prefetch(self.roster.photo_urls())
+
     def load_student_photo(self, photo_url):
-        if not photo_url:
+        self.photo_url = photo_url
+        if not photo_url or not self.photo_cache:
             self.set_default_photo()
             return
 
-        try:
-            response = requests.get(photo_url, timeout=5)
-            image = QImage()
-            success = image.loadFromData(response.content)
-
-            if not success:
-                self.set_default_photo()
-                return
-
-            scaled_image = image.scaled(
-                200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
-            self.student_photo.setPixmap(QPixmap.fromImage(scaled_image))
-        except Exception as e:
-            print(f"Error loading photo: {e}")
+        image = self.photo_cache.get(photo_url)
+        if image is None:
+            # show_student_photo puts it up once the download finishes
             self.set_default_photo()
+            return
+        self.student_photo.setPixmap(QPixmap.fromImage(image))
+
+    def show_student_photo(self, photo_url, image):
+        # Ignore photos for a student who is no longer on screen
+        if photo_url == self.photo_url:
+            self.student_photo.setPixmap(QPixmap.fromImage(image))
 
     def set_default_photo(self):
         default_image = QImage(200, 200, QImage.Format_RGB888)
         default_image.fill(Qt.lightGray)
         self.student_photo.setPixmap(QPixmap.fromImage(default_image))
 
-    def play_success_sound(self):
-        pygame.mixer.music.load("sounds/thank-you.mp3")
-        pygame.mixer.music.play()
+    def play_success_sound(self, scan_data=None):
+        if self.audio is None:
+            return
+        self.audio.play_file("thank-you.mp3", self.scan_times.pop(scan_data, None))
 
     def play_error_sound(self):
-        pygame.mixer.music.load("sounds/error-occured.mp3")
-        pygame.mixer.music.play()
+        if self.audio is None:
+            return
+        self.audio.play_file("error-occured.mp3")
 
     def closeEvent(self, event):
         self.stop_scanner()
+        if self.photo_cache:
+            self.photo_cache.shutdown()
+        if self.speech:
+            self.speech.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
         self.save_config()
         event.accept()
 
 
 def main():
+    timeline = StartupTimeline(STARTUP_STARTED)
+    timeline.mark("imports")
     app = QApplication(sys.argv)
-    window = ScannerApp()
+    timeline.mark("qt")
+    window = ScannerApp(timeline)
     window.show()
+    timeline.mark("show")
+    QTimer.singleShot(0, window.finish_startup)
     sys.exit(app.exec_())
 
 
 if __name__ == "__main__":
+    # Decode pool workers re-enter the frozen exe on Windows
+    multiprocessing.freeze_support()
     main()
@@ -5,8 +5,8 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('sounds/*', 'sounds/'), ('config.json', '.')],
-    hiddenimports=['pyttsx3.drivers', 'pyttsx3.drivers.sapi5'],
+    datas=[('sounds/*', 'sounds/'), ('samples/qr/*', 'samples/qr/'), ('config.json', '.')],
+    hiddenimports=['pyttsx3', 'pyttsx3.drivers', 'pyttsx3.drivers.sapi5'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,240 @@
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds in seconds, from sub-millisecond decode stages to slow uploads
+BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def quantile(self, q):
+        """Estimated from the buckets, linear inside the bucket it falls in"""
+        with self.lock:
+            counts = list(self.counts)
+            total = self.count
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def render(self):
+        with self.lock:
+            counts = list(self.counts)
+            total, seconds = self.count, self.sum
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {total}')
+        lines.append(f"{self.name}_sum {seconds}")
+        lines.append(f"{self.name}_count {total}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def render(self):
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {self.value}",
+        ]
+
+
+class MetricsRegistry:
+    """Stage histograms and counters for the scan path, rendered for Prometheus
+
+    Modules look their metrics up once at import and keep the object, so
+    recording a sample is a bisect and a lock, cheap enough for every frame.
+    """
+
+    def __init__(self, prefix="scanner"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.metrics = {}
+
+    def histogram(self, stage, help_text=""):
+        return self.get(Histogram, f"{self.prefix}_{stage}_seconds", help_text)
+
+    def counter(self, name, help_text=""):
+        return self.get(Counter, f"{self.prefix}_{name}_total", help_text)
+
+    def get(self, kind, name, help_text):
+        metric = self.metrics.get(name)
+        if metric is None:
+            with self.lock:
+                metric = self.metrics.setdefault(name, kind(name, help_text))
+        return metric
+
+    def render(self):
+        lines = []
+        for name in sorted(self.metrics):
+            lines.extend(self.metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """One line per stage with p50/p95 in ms, for the diagnostics overlay"""
+        lines = []
+        for name in sorted(self.metrics):
+            metric = self.metrics[name]
+            short = name[len(self.prefix) + 1 :]
+            if isinstance(metric, Histogram):
+                if not metric.count:
+                    continue
+                lines.append(
+                    f"{short[: -len('_seconds')]}: "
+                    f"p50 {metric.quantile(0.5) * 1000:.1f} ms, "
+                    f"p95 {metric.quantile(0.95) * 1000:.1f} ms, n={metric.count}"
+                )
+            else:
+                lines.append(f"{short}: {metric.value}")
+        return lines
+
+
+class LatencyWindow:
+    """The most recent latencies of one object, exact percentiles for its stats()
+
+    The registry histograms add up every lane and run; a window answers for
+    a single player, renderer or transport. Samples also go to histogram.
+    """
+
+    def __init__(self, histogram=None, size=500):
+        self.histogram = histogram
+        self.samples = deque(maxlen=size)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        if self.histogram:
+            self.histogram.observe(seconds)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def summary(self, quantiles=(0.5, 0.95), prefix="", digits=2):
+        """{prefix}p50_ms, {prefix}p95_ms and {prefix}max_ms, empty without samples"""
+        samples = sorted(self.samples)
+        if not samples:
+            return {}
+        stats = {
+            f"{prefix}p{round(q * 100)}_ms": round(
+                samples[min(int(len(samples) * q), len(samples) - 1)] * 1000, digits
+            )
+            for q in quantiles
+        }
+        stats[f"{prefix}max_ms"] = round(samples[-1] * 1000, digits)
+        return stats
+
+
+# Shared by every module on the scan path, like the logging module's root logger
+METRICS = MetricsRegistry()
+
+
+class MetricsServer:
+    """Serves /metrics on localhost from a daemon thread"""
+
+    def __init__(self, port=9108, host="127.0.0.1", registry=METRICS):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        self.server = None
+
+    def start(self):
+        # http.server pulls in email and html, kept off the startup path
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self.registry
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                content = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+        except OSError as e:
+            logging.error(f"Metrics endpoint not started on port {self.port}: {e}")
+            return False
+        self.server.daemon_threads = True
+        threading.Thread(
+            target=self.server.serve_forever, name="metrics", daemon=True
+        ).start()
+        logging.info(f"Metrics on http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
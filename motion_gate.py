@@ -0,0 +1,71 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Skips decoding while a tiny thumbnail matches the running background
+
+    Each thumbnail cell averages a block of the frame, so sensor noise stays
+    small while a card entering the view moves the cells it covers a lot. A
+    frame is decoded once min_cells cells differ from the background by more
+    than threshold grey levels, however little of the frame the card covers.
+    """
+
+    def __init__(
+        self,
+        threshold=12.0,
+        min_cells=2,
+        thumb_size=(32, 24),
+        learning_rate=0.05,
+        hold_seconds=1.0,
+    ):
+        self.threshold = threshold
+        self.min_cells = min_cells
+        self.thumb_size = thumb_size
+        self.learning_rate = learning_rate
+        self.hold_seconds = hold_seconds
+        self.background = None
+        # Reused every frame, the thumbnail size never changes
+        self.thumb = np.empty(thumb_size[::-1], dtype=np.uint8)
+        self.thumb_float = np.empty(thumb_size[::-1], dtype=np.float32)
+        self.diff = np.empty(thumb_size[::-1], dtype=np.float32)
+        self.changed = np.empty(thumb_size[::-1], dtype=np.uint8)
+        self.last_code_time = 0
+        self.passed_frames = 0
+        self.skipped_frames = 0
+
+    def should_decode(self, gray):
+        cv2.resize(gray, self.thumb_size, dst=self.thumb, interpolation=cv2.INTER_AREA)
+        thumb = self.thumb_float
+        thumb[...] = self.thumb
+        if self.background is None:
+            self.background = thumb.copy()
+            self.passed_frames += 1
+            return True
+
+        cv2.absdiff(thumb, self.background, dst=self.diff)
+        cv2.compare(self.diff, self.threshold, cv2.CMP_GT, dst=self.changed)
+        changed_cells = cv2.countNonZero(self.changed)
+        cv2.accumulateWeighted(thumb, self.background, self.learning_rate)
+
+        # Keep decoding for a moment after a code, the card may still be in view
+        recent_code = time.time() - self.last_code_time < self.hold_seconds
+        if changed_cells >= self.min_cells or recent_code:
+            self.passed_frames += 1
+            return True
+
+        self.skipped_frames += 1
+        return False
+
+    def code_seen(self):
+        self.last_code_time = time.time()
+
+    def stats(self):
+        total = max(self.passed_frames + self.skipped_frames, 1)
+        return {
+            "gate_passed": self.passed_frames,
+            "gate_skipped": self.skipped_frames,
+            "gate_skip_rate": round(self.skipped_frames / total, 3),
+        }
@@ -0,0 +1,92 @@
+import cv2
+
+from preprocess import BufferCache
+
+
+def has_finder_patterns(gray, min_count=2):
+    """Cheap check for the nested squares QR codes carry in three corners"""
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    contours, hierarchy = cv2.findContours(
+        binary, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE
+    )
+    if hierarchy is None:
+        return False
+
+    hierarchy = hierarchy[0]
+    found = 0
+    for i, contour in enumerate(contours):
+        # A finder pattern is a square holding a square holding a square
+        depth = 0
+        child = hierarchy[i][2]
+        while child != -1 and depth < 3:
+            depth += 1
+            child = hierarchy[child][2]
+        if depth != 2:
+            continue
+
+        x, y, w, h = cv2.boundingRect(contour)
+        if w >= 6 and 0.7 < w / h < 1.3:
+            found += 1
+            if found >= min_count:
+                return True
+    return False
+
+
+class ScalePyramid:
+    """Tries downscaled images first and full resolution only when worth it"""
+
+    def __init__(self, scales=(0.5,), min_size=160):
+        self.scales = sorted(scale for scale in scales if 0 < scale < 1)
+        self.min_size = min_size
+        self.attempts = {scale: 0 for scale in self.scales + [1.0]}
+        self.hits = {scale: 0 for scale in self.scales + [1.0]}
+        self.skipped_full_scans = 0
+        self.buffers = BufferCache()
+
+    def decode(self, gray, read_codes):
+        """Returns read_codes results with polygons in full-resolution coordinates"""
+        height, width = gray.shape[:2]
+        small = None
+        for scale in self.scales:
+            if min(height, width) * scale < self.min_size:
+                continue
+            size = (int(width * scale), int(height * scale))
+            small = self.buffers.get(scale, (size[1], size[0]))
+            cv2.resize(gray, size, dst=small, interpolation=cv2.INTER_AREA)
+            self.attempts[scale] += 1
+            codes = read_codes(small)
+            if codes:
+                self.hits[scale] += 1
+                return [
+                    (
+                        data,
+                        [
+                            (int(round(x / scale)), int(round(y / scale)))
+                            for x, y in polygon
+                        ],
+                    )
+                    for data, polygon in codes
+                ]
+
+        # Nothing at low resolution, only pay for the full pass if it looks worth it
+        if small is not None and not has_finder_patterns(small):
+            self.skipped_full_scans += 1
+            return []
+
+        self.attempts[1.0] += 1
+        codes = read_codes(gray)
+        if codes:
+            self.hits[1.0] += 1
+        return codes
+
+    def stats(self):
+        stats = {
+            f"scale_{scale}": {
+                "attempts": self.attempts[scale],
+                "hits": self.hits[scale],
+                "hit_rate": round(self.hits[scale] / max(self.attempts[scale], 1), 3),
+            }
+            for scale in self.attempts
+        }
+        stats["skipped_full_scans"] = self.skipped_full_scans
+        return stats
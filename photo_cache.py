@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from metrics import METRICS
+
+FETCH_TIME = METRICS.histogram(
+    "photo_load", "Disk read, revalidation or download of a photo"
+)
+MEMORY_HITS = METRICS.counter("photo_memory_hits", "Photos served from memory")
+MEMORY_MISSES = METRICS.counter("photo_memory_misses", "Photos loaded in background")
+
+
+class PhotoCache(QObject):
+    """Student photos in two tiers: scaled QImages in memory, raw files on disk
+
+    Downloads run in a small thread pool and finished photos are announced
+    through photo_ready, disk copies are revalidated with ETag/Last-Modified.
+    """
+
+    photo_ready = pyqtSignal(str, QImage)
+
+    def __init__(
+        self,
+        cache_dir="photo_cache",
+        memory_items=200,
+        disk_bytes=50 * 1024 * 1024,
+        workers=2,
+        size=(200, 200),
+    ):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.memory_items = memory_items
+        self.disk_bytes = disk_bytes
+        self.size = size
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.in_flight = set()
+        # URLs someone asked to see, published when their download finishes
+        self.show_requested = set()
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="photo"
+        )
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.downloads = 0
+        self.invalidations = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, url):
+        """Returns the scaled photo if it is in memory, otherwise starts loading it"""
+        with self.lock:
+            image = self.memory.get(url)
+            if image is not None:
+                self.memory.move_to_end(url)
+                self.memory_hits += 1
+                MEMORY_HITS.inc()
+                return image
+        MEMORY_MISSES.inc()
+        self.load(url, show=True)
+        return None
+
+    def prefetch(self, urls):
+        """Fills the disk tier ahead of time, nothing is decoded or shown"""
+        for url in urls:
+            if url and not os.path.exists(self.file_path(url)):
+                self.load(url, show=False)
+
+    def invalidate(self, url):
+        """Forgets a photo in both tiers, the next get() downloads it again"""
+        with self.lock:
+            self.memory.pop(url, None)
+        path = self.file_path(url)
+        for stale in (path, f"{path}.json"):
+            if os.path.exists(stale):
+                os.remove(stale)
+        self.invalidations += 1
+
+    def load(self, url, show):
+        with self.lock:
+            # A download already running for a prefetch still shows the photo
+            if show:
+                self.show_requested.add(url)
+            if url in self.in_flight:
+                return
+            self.in_flight.add(url)
+        self.executor.submit(self.fetch, url)
+
+    def file_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest())
+
+    def wants_show(self, url):
+        with self.lock:
+            return url in self.show_requested
+
+    def fetch(self, url):
+        started = time.perf_counter()
+        content = None
+        shown = False
+        try:
+            path = self.file_path(url)
+            meta = self.read_meta(path)
+            if meta is not None:
+                with open(path, "rb") as f:
+                    content = f.read()
+                self.disk_hits += 1
+                # Show the disk copy now, revalidation replaces it only if changed
+                if self.wants_show(url):
+                    self.publish(url, content)
+                    shown = True
+
+            headers = {}
+            if meta and meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta and meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+            try:
+                response = self.session.get(url, headers=headers, timeout=5)
+            except requests.RequestException as e:
+                response = None
+                if content is None:
+                    logging.error(f"Error loading photo: {e}")
+
+            if response is not None and response.status_code == 304:
+                # Still current, keeps it out of the way of the size trimming
+                os.utime(path)
+            elif response is not None and response.status_code == 200:
+                self.downloads += 1
+                self.write(path, response)
+                content = response.content
+                shown = False
+        except Exception as e:
+            logging.error(f"Photo cache error: {e}")
+        finally:
+            FETCH_TIME.observe(time.perf_counter() - started)
+            with self.lock:
+                self.in_flight.discard(url)
+                show = url in self.show_requested
+                self.show_requested.discard(url)
+
+        # Also covers a get() that arrived while this ran as a prefetch
+        if show and content is not None and not shown:
+            try:
+                self.publish(url, content)
+            except Exception as e:
+                logging.error(f"Photo cache error: {e}")
+
+    def publish(self, url, content):
+        image = QImage()
+        if not image.loadFromData(content):
+            return
+        image = image.scaled(*self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        with self.lock:
+            self.memory[url] = image
+            self.memory.move_to_end(url)
+            while len(self.memory) > self.memory_items:
+                self.memory.popitem(last=False)
+        self.photo_ready.emit(url, image)
+
+    def read_meta(self, path):
+        try:
+            with open(f"{path}.json", "r") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta if os.path.exists(path) else None
+
+    def write(self, path, response):
+        with open(path, "wb") as f:
+            f.write(response.content)
+        with open(f"{path}.json", "w") as f:
+            json.dump(
+                {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                },
+                f,
+            )
+        self.trim_disk()
+
+    def trim_disk(self):
+        """Deletes the least recently used photos once over the size budget"""
+        files = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".json") or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            for stale in (path, f"{path}.json"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            total -= size
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "downloads": self.downloads,
+            "invalidations": self.invalidations,
+            "memory_items": len(self.memory),
+        }
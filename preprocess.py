@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class BufferCache:
+    """Output arrays keyed by (name, shape), the least recently used one goes first
+
+    ROI crops, scaled images and full frames alternate within one frame, so
+    each shape keeps its own array instead of replacing the last one.
+    """
+
+    def __init__(self, max_items=8):
+        self.max_items = max_items
+        self.buffers = OrderedDict()
+        self.allocations = 0
+
+    def get(self, name, shape):
+        key = (name, shape)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self.allocations += 1
+            self.buffers[key] = buffer
+            while len(self.buffers) > self.max_items:
+                self.buffers.popitem(last=False)
+        else:
+            self.buffers.move_to_end(key)
+        return buffer
+
+
+class FramePreprocessor:
+    """Turns BGR frames into the adjusted, equalised grayscale images zbar reads"""
+
+    def __init__(self, brightness=50, contrast=50, clip_limit=2.0, tile_grid=(8, 8)):
+        self.clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid)
+        self.settings = None
+        self.lut = None
+        self.buffers = BufferCache()
+        self.configure(brightness, contrast)
+
+    def configure(self, brightness, contrast):
+        """Rebuilds the brightness/contrast table, a no-op if nothing changed"""
+        if self.settings == (brightness, contrast):
+            return
+        self.settings = (brightness, contrast)
+        # Same mapping convertScaleAbs used: |x * alpha + beta| saturated to uint8
+        values = np.abs(np.arange(256) * (contrast / 50.0) + brightness)
+        self.lut = np.clip(values, 0, 255).astype(np.uint8)
+
+    def buffer(self, name, shape):
+        """Reuses the output array for a stage and image size"""
+        return self.buffers.get(name, shape)
+
+    def to_gray(self, frame):
+        """Grayscale first, so the adjustment touches one channel instead of three"""
+        gray = self.buffer("gray", frame.shape[:2])
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+        cv2.LUT(gray, self.lut, dst=gray)
+        return gray
+
+    def equalize(self, gray):
+        equalized = self.buffer("equalized", gray.shape[:2])
+        self.clahe.apply(gray, equalized)
+        return equalized
@@ -0,0 +1,63 @@
+import time
+
+import cv2
+import numpy as np
+from PyQt5.QtGui import QImage, QPixmap
+
+from metrics import METRICS, LatencyWindow
+
+RENDER_TIME = METRICS.histogram("preview_render", "Preview scale and pixmap upload")
+
+
+class PreviewRenderer:
+    """Scales camera frames into a reused display buffer at a capped frame rate
+
+    One cv2.resize pass writes straight into the buffer and Qt reads it as BGR,
+    so there is no colour swap, no full-size copy and no Qt smooth scaling.
+    """
+
+    def __init__(self, size=(1024, 480), fps=15):
+        self.size = size
+        self.interval = 1 / fps if fps > 0 else 0
+        self.buffer = None
+        self.last_render = 0
+        self.rendered = 0
+        self.skipped = 0
+        self.render_times = LatencyWindow(RENDER_TIME)
+
+    def due(self):
+        """True once the preview interval has passed, counts the frames it skips"""
+        if time.perf_counter() - self.last_render >= self.interval:
+            return True
+        self.skipped += 1
+        return False
+
+    def render(self, frame, label, boundary=None, draw_boundary=None):
+        """Shows frame on label, the pixmap upload is part of the measured time"""
+        started = time.perf_counter()
+        h, w = frame.shape[:2]
+        scale = min(self.size[0] / w, self.size[1] / h)
+        out_w, out_h = max(1, int(w * scale)), max(1, int(h * scale))
+        if self.buffer is None or self.buffer.shape[:2] != (out_h, out_w):
+            self.buffer = np.empty((out_h, out_w, 3), dtype=np.uint8)
+
+        # INTER_AREA looks a little better but costs ~8x more at 1080p
+        cv2.resize(
+            frame, (out_w, out_h), dst=self.buffer, interpolation=cv2.INTER_LINEAR
+        )
+        if boundary is not None and draw_boundary is not None:
+            # Outline drawn on the small buffer, the shared frame stays untouched
+            draw_boundary(self.buffer, np.array(boundary, dtype=np.float32) * scale)
+
+        image = QImage(
+            self.buffer.data, out_w, out_h, self.buffer.strides[0], QImage.Format_BGR888
+        )
+        label.setPixmap(QPixmap.fromImage(image))
+        self.last_render = time.perf_counter()
+        self.render_times.add(self.last_render - started)
+        self.rendered += 1
+
+    def stats(self):
+        stats = {"rendered": self.rendered, "skipped": self.skipped}
+        stats.update(self.render_times.summary(prefix="render_"))
+        return stats
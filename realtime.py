@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import ssl
+import threading
+
+import websockets
+
+
+class WebSocketClient:
+    """Pusher/Soketi connection owned by a long-lived asyncio loop on its own thread
+
+    start() returns at once, the loop connects, subscribes and reconnects with
+    exponential backoff and jitter. send() and the listeners are the only ways
+    in and out and both are safe to use from any thread.
+    """
+
+    def __init__(
+        self,
+        soketi_config,
+        channels=("attendance",),
+        min_backoff=1.0,
+        max_backoff=60.0,
+    ):
+        self.soketi_config = soketi_config
+        self.channels = channels
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.listeners = []
+        self.loop = None
+        self.thread = None
+        self.stopping = None
+        self.session_task = None
+        self.outbox = None
+        self.ws = None
+        self.socket_id = None
+        self.connected = threading.Event()
+        self.connects = 0
+        self.failures = 0
+        self.received = 0
+        self.sent = 0
+        self.last_error = None
+
+    def add_listener(self, callback):
+        """callback(event, channel, data) runs on the network thread"""
+        self.listeners.append(callback)
+
+    def start(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run, name="realtime", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.thread:
+            return
+        self.loop.call_soon_threadsafe(self.shutdown)
+        self.thread.join(timeout=5)
+        self.thread = None
+
+    def shutdown(self):
+        self.stopping.set()
+        # A connect or handshake can hang for its whole timeout, do not wait it
+        # out. An open connection closes itself, close_timeout bounds that.
+        if self.session_task and not self.connected.is_set():
+            self.session_task.cancel()
+
+    def send(self, event, data, channel=None):
+        """Queues a message for the socket, False if it is not connected right now"""
+        if not self.connected.is_set():
+            return False
+        message = {"event": event, "data": data}
+        if channel:
+            message["channel"] = channel
+        self.loop.call_soon_threadsafe(self.outbox.put_nowait, json.dumps(message))
+        return True
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.stopping = asyncio.Event()
+        self.outbox = asyncio.Queue()
+        try:
+            self.loop.run_until_complete(self.maintain())
+        finally:
+            self.loop.close()
+
+    def url(self):
+        soketi = self.soketi_config
+        protocol = "wss" if soketi.get("use_ssl", True) else "ws"
+        return (
+            f"{protocol}://{soketi.get('host')}:{soketi.get('port')}"
+            f"/app/{soketi.get('key')}?protocol=7&client=py&version=4.5.0"
+        )
+
+    async def maintain(self):
+        """Keeps one connection up until stop(), backing off between attempts"""
+        attempt = 0
+        while not self.stopping.is_set():
+            self.session_task = asyncio.ensure_future(self.session())
+            try:
+                await self.session_task
+            except asyncio.CancelledError:
+                if not self.stopping.is_set():
+                    raise
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logging.error(f"WebSocket connection failed: {e}")
+            self.session_task = None
+            if self.connected.is_set():
+                # The connection was up, so a drop starts the backoff over
+                attempt = 0
+            self.connected.clear()
+            self.ws = None
+
+            if self.stopping.is_set():
+                break
+            # The delay doubles per failure, jitter keeps stations from
+            # reconnecting in lockstep after a server restart
+            delay = min(self.max_backoff, self.min_backoff * 2**attempt)
+            delay = random.uniform(delay / 2, delay)
+            attempt += 1
+            try:
+                await asyncio.wait_for(self.stopping.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def session(self):
+        ssl_context = None
+        if self.soketi_config.get("use_ssl", True):
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+
+        async with websockets.connect(
+            self.url(),
+            ssl=ssl_context,
+            open_timeout=10,
+            close_timeout=1,
+            ping_interval=20,
+            ping_timeout=10,
+        ) as ws:
+            self.ws = ws
+            established = json.loads(await asyncio.wait_for(ws.recv(), 10))
+            if established.get("event") != "pusher:connection_established":
+                raise ConnectionError(f"Unexpected handshake: {established}")
+            info = json.loads(established["data"])
+            self.socket_id = info["socket_id"]
+            activity_timeout = info.get("activity_timeout", 120)
+
+            for channel in self.channels:
+                await self.subscribe(channel)
+
+            # Anything queued while offline was already refused by send()
+            while not self.outbox.empty():
+                self.outbox.get_nowait()
+            self.connects += 1
+            self.connected.set()
+            logging.info(f"WebSocket connected, socket {self.socket_id}")
+
+            tasks = [
+                asyncio.ensure_future(self.read_loop(ws, activity_timeout)),
+                asyncio.ensure_future(self.write_loop(ws)),
+                asyncio.ensure_future(self.stopping.wait()),
+            ]
+            done, pending = await asyncio.wait(
+                tasks, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in pending:
+                task.cancel()
+            for task in done:
+                task.result()
+
+    def get_auth_signature(self, socket_id, channel):
+        """Generates auth signature for private channels"""
+        secret = self.soketi_config.get("secret", "")
+        string_to_sign = f"{socket_id}:{channel}"
+        signature = hmac.new(
+            secret.encode(), string_to_sign.encode(), hashlib.sha256
+        ).hexdigest()
+        return f"{self.soketi_config.get('key')}:{signature}"
+
+    async def subscribe(self, channel):
+        subscribe_payload = {
+            "event": "pusher:subscribe",
+            "data": {
+                "channel": channel,
+                "auth": self.get_auth_signature(self.socket_id, channel),
+            },
+        }
+        await self.ws.send(json.dumps(subscribe_payload))
+
+    async def read_loop(self, ws, activity_timeout):
+        waiting_for_pong = False
+        while True:
+            try:
+                message = await asyncio.wait_for(ws.recv(), activity_timeout)
+            except asyncio.TimeoutError:
+                # Pusher keepalive: ping after a quiet period, give up if the
+                # server stays silent for another one
+                if waiting_for_pong:
+                    raise ConnectionError("No pong from server")
+                waiting_for_pong = True
+                await ws.send(json.dumps({"event": "pusher:ping", "data": {}}))
+                continue
+            waiting_for_pong = False
+
+            data = json.loads(message)
+            event = data.get("event", "")
+            if event == "pusher:ping":
+                await ws.send(json.dumps({"event": "pusher:pong", "data": {}}))
+                continue
+            if event == "pusher:error":
+                logging.error(f"WebSocket error event: {data.get('data')}")
+                continue
+            if event.startswith("pusher:"):
+                continue
+
+            self.received += 1
+            payload = data.get("data")
+            if isinstance(payload, str):
+                try:
+                    payload = json.loads(payload)
+                except ValueError:
+                    pass
+            for listener in self.listeners:
+                try:
+                    listener(event, data.get("channel"), payload)
+                except Exception as e:
+                    logging.error(f"WebSocket listener failed on {event}: {e}")
+
+    async def write_loop(self, ws):
+        while True:
+            message = await self.outbox.get()
+            await ws.send(message)
+            self.sent += 1
+
+    def stats(self):
+        return {
+            "connected": self.connected.is_set(),
+            "connects": self.connects,
+            "failures": self.failures,
+            "received": self.received,
+            "sent": self.sent,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,63 @@
+# Crop edges snap to this grid so a card moving a few pixels keeps the crop
+# size, and with it the decode buffers sized for it
+GRID = 32
+
+
+class RoiTracker:
+    """Decodes a padded crop around the last code before scanning the full frame"""
+
+    def __init__(self, padding=0.5, full_scan_every=15):
+        self.padding = padding
+        self.full_scan_every = full_scan_every
+        self.box = None
+        self.frames_since_full_scan = 0
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self.full_scans = 0
+
+    def decode(self, frame, read_codes):
+        """Returns read_codes results with polygons in full-frame coordinates"""
+        if self.box is not None and self.frames_since_full_scan < self.full_scan_every:
+            self.frames_since_full_scan += 1
+            x0, y0, x1, y1 = self.box
+            codes = read_codes(frame[y0:y1, x0:x1])
+            if codes:
+                self.roi_hits += 1
+                codes = [
+                    (data, [(x + x0, y + y0) for x, y in polygon])
+                    for data, polygon in codes
+                ]
+                self.track(codes, frame.shape)
+                return codes
+            # The card moved or left, look at the whole frame again
+            self.roi_misses += 1
+
+        self.full_scans += 1
+        self.frames_since_full_scan = 0
+        codes = read_codes(frame)
+        self.track(codes, frame.shape)
+        return codes
+
+    def track(self, codes, shape):
+        if not codes:
+            self.box = None
+            return
+
+        xs = [x for _, polygon in codes for x, _ in polygon]
+        ys = [y for _, polygon in codes for _, y in polygon]
+        pad_x = int((max(xs) - min(xs)) * self.padding)
+        pad_y = int((max(ys) - min(ys)) * self.padding)
+        height, width = shape[:2]
+        self.box = (
+            max((min(xs) - pad_x) // GRID * GRID, 0),
+            max((min(ys) - pad_y) // GRID * GRID, 0),
+            min(-(-(max(xs) + pad_x) // GRID) * GRID, width),
+            min(-(-(max(ys) + pad_y) // GRID) * GRID, height),
+        )
+
+    def stats(self):
+        return {
+            "roi_hits": self.roi_hits,
+            "roi_misses": self.roi_misses,
+            "full_scans": self.full_scans,
+        }
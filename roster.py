@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import threading
+
+
+class RosterIndex:
+    """Students expected at this station keyed by QR payload, kept on disk"""
+
+    def __init__(self, path="roster_cache.json"):
+        self.path = path
+        self.lock = threading.Lock()
+        # payload -> (name, class, photo_url), tuples keep the index compact
+        self.entries = {}
+        self.station_code = None
+        self.synced_at = None
+
+    def load(self, station_code):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            data = {}
+
+        with self.lock:
+            # A cache written for another station is useless here
+            if data.get("station_code") == station_code:
+                self.entries = {k: tuple(v) for k, v in data["entries"].items()}
+                self.synced_at = data.get("synced_at")
+            else:
+                self.entries = {}
+                self.synced_at = None
+            self.station_code = station_code
+
+    def save(self):
+        with self.lock:
+            data = {
+                "station_code": self.station_code,
+                "synced_at": self.synced_at,
+                "entries": self.entries,
+            }
+            # Realtime events and the sync thread both save, the rename stays
+            # inside the lock so neither replaces a file the other is writing
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+
+    def lookup(self, scan_data):
+        entry = self.entries.get(scan_data)
+        if entry is None:
+            return None
+        name, class_name, photo_url = entry
+        return {"student_name": name, "class": class_name, "photo_url": photo_url}
+
+    def apply(self, students, removed=(), synced_at=None):
+        with self.lock:
+            for student in students:
+                self.entries[student["qr"]] = (
+                    student.get("name", ""),
+                    student.get("class", ""),
+                    student.get("photo_url"),
+                )
+            for scan_data in removed:
+                self.entries.pop(scan_data, None)
+            if synced_at:
+                self.synced_at = synced_at
+
+    def refresh(self, scanner):
+        """Pulls roster changes since the last sync, everything on the first run"""
+        changes = scanner.fetch_roster(since=self.synced_at)
+        if changes is None:
+            return False
+        self.apply(
+            changes.get("students", []),
+            changes.get("removed", []),
+            changes.get("server_time"),
+        )
+        self.save()
+        logging.info(
+            f"Roster refreshed: {len(changes.get('students', []))} changed, "
+            f"{len(changes.get('removed', []))} removed, {len(self.entries)} total"
+        )
+        return True
+
+    def photo_urls(self):
+        return [photo_url for _, _, photo_url in self.entries.values() if photo_url]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class RosterSync:
+    """Refreshes the roster index in the background"""
+
+    def __init__(self, roster, scanner, interval=900, on_refresh=None, live=None):
+        self.roster = roster
+        self.scanner = scanner
+        self.interval = interval
+        self.on_refresh = on_refresh
+        # Set while pushed events keep the index current, polling is skipped
+        self.live = live
+        self.wake = threading.Event()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="roster-sync", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def refresh_now(self):
+        self.wake.set()
+
+    def run(self):
+        woken = True
+        while self.running:
+            if woken or not (self.live and self.live.is_set()):
+                try:
+                    if self.roster.refresh(self.scanner) and self.on_refresh:
+                        self.on_refresh()
+                except Exception as e:
+                    logging.error(f"Roster refresh error: {e}")
+            woken = self.wake.wait(self.interval)
+            self.wake.clear()
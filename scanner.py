@@ -1,77 +1,81 @@
 import numpy as np
 import cv2
-from pyzbar.pyzbar import decode, ZBarSymbol
 import requests
-import json
 import time
+from datetime import datetime
 import logging
-import ssl
-import hashlib
-import hmac
-import websockets
-import asyncio
+from roi_tracker import RoiTracker
+from multiscale import ScalePyramid
+from preprocess import FramePreprocessor
+from motion_gate import MotionGate
+from decoders import create_decoder
+from dedup_cache import ScanDedupCache
+from defaults import DEFAULT_CONFIG, merge_defaults
+from metrics import METRICS
+
+PREPROCESS_TIME = METRICS.histogram("preprocess", "Grayscale and brightness LUT")
+DECODE_TIME = METRICS.histogram("decode", "Equalise and barcode decode per frame")
+API_SCAN_TIME = METRICS.histogram("api_scan", "POST /api/scan including retries")
+API_BULK_TIME = METRICS.histogram("api_scan_bulk", "POST /api/scan/bulk")
+FRAMES_GATED = METRICS.counter("frames_gated", "Frames skipped by the motion gate")
+CODES_READ = METRICS.counter("codes_read", "Frames with at least one code")
+API_ERRORS = METRICS.counter("api_scan_errors", "Scan posts that returned an error")
 
 
 class Scanner:
     def __init__(self, server_url, station_code):
         self.server_url = server_url
         self.station_code = station_code
-        self.last_scan = 0
-        self.scan_cooldown = 2
-        self.soketi_config = {}
-        self.ws = None
+        self.dedup = ScanDedupCache()
+        self.bulk_supported = None
+        self.configure_submission({})
+        self.last_polygon = None
+        self.roi_tracker = None
+        self.scale_pyramid = None
+        self.preprocessor = FramePreprocessor()
+        self.motion_gate = None
+        self.decoder = create_decoder("pyzbar")
+        # Set from the GUI thread, applied by the thread that decodes
+        self.pending_decode_config = None
 
-    async def init_websocket(self):
-        soketi = self.soketi_config
-        protocol = "wss" if soketi.get("use_ssl", True) else "ws"
-        ws_url = f"{protocol}://{soketi.get('host')}:{soketi.get('port')}/app/{soketi.get('key')}?protocol=7&client=py&version=4.5.0"
+    def update_config(self, config):
+        self.server_url = config.get("server_url")
+        self.station_code = config.get("station_code")
 
-        try:
-            if soketi.get("use_ssl", True):
-                ssl_context = ssl.create_default_context()
-                ssl_context.check_hostname = False
-                ssl_context.verify_mode = ssl.CERT_NONE
-                self.ws = await websockets.connect(
-                    ws_url, ssl=ssl_context, close_timeout=5, ping_timeout=5
-                )
-            else:
-                self.ws = await websockets.connect(
-                    ws_url, close_timeout=5, ping_timeout=5
-                )
+    def reconfigure_decode(self, decode_config):
+        """configure_decode() for a scanner another thread is decoding with"""
+        self.pending_decode_config = decode_config
 
-            socket_id = await self.get_socket_id()
-            auth_signature = self.get_auth_signature(socket_id, "attendance")
-            await self.subscribe(auth_signature)
+    def configure_decode(self, decode_config):
+        decode_config = merge_defaults(decode_config, DEFAULT_CONFIG["decode"])
+        # An unresolved "auto" has no decoder of its own and falls back to zbar
+        self.decoder = create_decoder(decode_config["backend"])
 
-        except Exception as e:
-            logging.error(f"WebSocket connection failed: {e}")
-            print(f"Connection error: {e}")
-
-    async def get_socket_id(self):
-        message = await self.ws.recv()
-        data = json.loads(message)
-        if data.get("event") == "pusher:connection_established":
-            return json.loads(data["data"])["socket_id"]
-
-    def get_auth_signature(self, socket_id, channel):
-        secret = self.soketi_config.get("secret", "")
-        string_to_sign = f"{socket_id}:{channel}"
-        signature = hmac.new(
-            secret.encode(), string_to_sign.encode(), hashlib.sha256
-        ).hexdigest()
-        return f"{self.soketi_config.get('key')}:{signature}"
-
-    async def subscribe(self, auth_signature):
-        subscribe_payload = {
-            "event": "pusher:subscribe",
-            "data": {"channel": "attendance", "auth": auth_signature},
-        }
-        await self.ws.send(json.dumps(subscribe_payload))
+        roi = decode_config["roi"]
+        if roi["enabled"]:
+            self.roi_tracker = RoiTracker(
+                padding=roi["padding"], full_scan_every=roi["full_scan_every"]
+            )
+        else:
+            self.roi_tracker = None
 
-    def update_config(self, config):
-        self.server_url = config.get("server_url")
-        self.station_code = config.get("station_code")
-        self.soketi_config = config.get("soketi", {})
+        scales = decode_config["scales"]
+        if scales:
+            self.scale_pyramid = ScalePyramid(
+                scales, min_size=decode_config["min_scaled_size"]
+            )
+        else:
+            self.scale_pyramid = None
+
+        gate = decode_config["motion_gate"]
+        if gate["enabled"]:
+            self.motion_gate = MotionGate(
+                threshold=gate["threshold"],
+                min_cells=gate["min_cells"],
+                hold_seconds=gate["hold_seconds"],
+            )
+        else:
+            self.motion_gate = None
 
     def draw_boundary(self, frame, points):
         if len(points) > 4:
@@ -83,81 +87,242 @@ class Scanner:
         if len(points) == 4:
             cv2.polylines(frame, [np.array(points, np.int32)], True, (0, 255, 0), 2)
 
-    def decode_frame(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        gray = clahe.apply(gray)
+    def set_image_adjustments(self, brightness, contrast):
+        self.preprocessor.configure(brightness, contrast)
 
+    def decode_frame(self, frame):
         try:
-            # codes = decode(gray)
-            codes = decode(gray, symbols=[ZBarSymbol.QRCODE])  # Restrict to QR only
-            if codes:
-                for code in codes:
-                    data = code.data.decode("utf-8")
-                    # Add format validation here
-                    if not self.is_valid_barcode_format(data):
-                        continue
-
-                    if self.is_valid_scan():
-                        self.draw_boundary(frame, code.polygon)
-                        return data, frame
-
-            return None, frame
+            return self.accept_codes(self.read_frame_codes(frame)), frame
 
         except Exception as e:
             # print(f"Error decoding frame: {e}")
             logging.error(f"Scan error: {str(e)}", exc_info=True)
             return None, frame
 
+    def read_frame_codes(self, frame):
+        """Runs the decode pipeline on a BGR frame without any scan validation"""
+        if self.pending_decode_config is not None:
+            decode_config, self.pending_decode_config = self.pending_decode_config, None
+            self.configure_decode(decode_config)
+        started = time.perf_counter()
+        gray = self.preprocessor.to_gray(frame)
+        PREPROCESS_TIME.observe(time.perf_counter() - started)
+        if self.motion_gate and not self.motion_gate.should_decode(gray):
+            FRAMES_GATED.inc()
+            return []
+
+        preprocessed = time.perf_counter()
+        if self.roi_tracker:
+            codes = self.roi_tracker.decode(gray, self.read_codes)
+        else:
+            codes = self.read_codes(gray)
+        DECODE_TIME.observe(time.perf_counter() - preprocessed)
+
+        if codes:
+            CODES_READ.inc()
+            if self.motion_gate:
+                self.motion_gate.code_seen()
+        return codes
+
+    def read_codes(self, gray):
+        if self.scale_pyramid:
+            return self.scale_pyramid.decode(gray, self.read_gray_codes)
+        return self.read_gray_codes(gray)
+
+    def read_gray_codes(self, gray):
+        return self.decoder.decode(self.preprocessor.equalize(gray))
+
+    def decode_stats(self):
+        stats = {}
+        if self.roi_tracker:
+            stats.update(self.roi_tracker.stats())
+        if self.scale_pyramid:
+            stats.update(self.scale_pyramid.stats())
+        if self.motion_gate:
+            stats.update(self.motion_gate.stats())
+        return stats
+
+    def accept_codes(self, codes):
+        """Picks the first code that passes validation from (data, polygon) pairs"""
+        for data, polygon in codes:
+            # Add format validation here
+            if not self.is_valid_barcode_format(data):
+                continue
+
+            if self.is_valid_scan(data):
+                self.last_polygon = polygon
+                return data
+
+        return None
+
     def is_valid_barcode_format(self, data):
         return len(data) >= 4 and len(data) <= 10
 
-    def is_valid_scan(self):
-        current_time = time.time()
-        if current_time - self.last_scan < self.scan_cooldown:
-            return False
-        self.last_scan = current_time
-        return True
+    def is_valid_scan(self, data):
+        # Only repeats of the same code are held back, other codes go through
+        return not self.dedup.seen(data)
 
-    def process_scan(self, scan_data):
-        try:
-            response = requests.post(
-                f"{self.server_url}/api/scan",
-                data={"scan_data": scan_data, "station_code": self.station_code},
-            )
+    def configure_submission(self, submission_config):
+        self.connect_timeout = submission_config.get("connect_timeout", 3)
+        self.read_timeout = submission_config.get("read_timeout", 10)
+        self.retries = submission_config.get("retries", 2)
+        # Keep-alive connections to server_url, shared by the submission threads
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=submission_config.get("workers", 2)
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
-            # print(f"Response: {response.text}")  # Debug
-            # print(f"Status code: {response.status_code}")  # Debug
-            # print(f"Server: {self.server_url}")  # Debug
-            # print(f"Station code: {self.station_code}")  # Debug
-            # print(f"Scan data: {scan_data}")  # Debug
-            return response.json()
+    def process_scan(
+        self, scan_data, scan_id=None, captured_at=None, station_code=None
+    ):
+        """Posts one scan, errors carry "retry" when the server was not reached"""
+        payload = {
+            "scan_data": scan_data,
+            "station_code": station_code or self.station_code,
+        }
+        headers = {}
+        if scan_id:
+            # Lets the server recognise a scan the journal sends a second time
+            payload["scan_id"] = scan_id
+            headers["Idempotency-Key"] = scan_id
+        if captured_at:
+            payload["scanned_at"] = datetime.fromtimestamp(captured_at).isoformat()
 
-        except Exception as e:
-            # print(f"Full error: {str(e)}")
-            return {"status": "error", "message": str(e)}
+        with API_SCAN_TIME.time():
+            result = self.post_scan(payload, headers)
+        if result.get("status") != "success":
+            API_ERRORS.inc()
+        return result
 
-    def enhance_frame(self, frame, brightness=1.0, contrast=1.0):
-        """Enhance frame quality for better scanning"""
-        # Convert to float for calculations
-        frame = frame.astype(float)
+    def post_scan(self, payload, headers):
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(
+                    f"{self.server_url}/api/scan",
+                    data=payload,
+                    headers=headers,
+                    timeout=(self.connect_timeout, self.read_timeout),
+                )
+                if response.status_code >= 500 and attempt < self.retries:
+                    time.sleep(0.2 * 2**attempt)
+                    continue
 
-        # Apply brightness
-        frame = frame * brightness
+                # print(f"Response: {response.text}")  # Debug
+                # print(f"Status code: {response.status_code}")  # Debug
+                return self.read_result(response)
 
-        # Apply contrast
-        frame = frame * contrast
+            except requests.ConnectionError as e:
+                # The request never reached the server, safe to send again
+                if attempt < self.retries:
+                    time.sleep(0.2 * 2**attempt)
+                    continue
+                return {"status": "error", "message": str(e), "retry": True}
 
-        # Clip values to valid range
-        frame = np.clip(frame, 0, 255)
+            except requests.Timeout as e:
+                return {"status": "error", "message": str(e), "retry": True}
 
-        # Convert back to uint8
-        return frame.astype(np.uint8)
+            except Exception as e:
+                # print(f"Full error: {str(e)}")
+                # No answer from the server, the journal keeps the scan
+                return {"status": "error", "message": str(e), "retry": True}
 
-    # async def connect_websocket(self):
-    #    soketi = self.soketi_config
-    #    ws_url = f"ws://{soketi.get('host', 'localhost')}:{soketi.get('port', '6001')}/app/{soketi.get('key', '')}"
+    def read_result(self, response):
+        """The server's JSON answer, a retryable error if it did not give one
 
-    #    self.ws = await websockets.connect(ws_url)
+        Only a parsed answer may mark a journaled scan as sent, a 5xx or an
+        error page means the scan has to be sent again.
+        """
+        if response.status_code >= 500:
+            return {
+                "status": "error",
+                "message": f"Server unavailable ({response.status_code})",
+                "retry": True,
+            }
+        try:
+            result = response.json()
+        except ValueError:
+            result = None
+        if not isinstance(result, dict):
+            return {
+                "status": "error",
+                "message": f"Unreadable server response ({response.status_code})",
+                "retry": True,
+            }
+        return result
 
-    #   await self.ws.send(json.dumps({"event": "subscribe", "channel": "attendance"}))
+    def process_scan_batch(self, scans):
+        """Posts (scan_id, scan_data, captured_at) scans in one bulk request
+
+        Returns one result per scan in the same order, or None when the server
+        has no bulk endpoint and the scans have to be sent one by one.
+        """
+        payload = {
+            "station_code": self.station_code,
+            "scans": [
+                {
+                    "scan_id": scan_id,
+                    "scan_data": scan_data,
+                    "scanned_at": datetime.fromtimestamp(captured_at).isoformat(),
+                }
+                for scan_id, scan_data, captured_at in scans
+            ],
+        }
+        try:
+            with API_BULK_TIME.time():
+                response = self.session.post(
+                    f"{self.server_url}/api/scan/bulk",
+                    json=payload,
+                    timeout=(self.connect_timeout, self.read_timeout),
+                )
+            if response.status_code in (404, 405, 501):
+                logging.info("Server has no bulk scan endpoint, sending scans singly")
+                self.bulk_supported = False
+                return None
+            answer = self.read_result(response)
+            if answer.get("retry"):
+                return [answer] * len(scans)
+
+            self.bulk_supported = True
+            results = {
+                r.get("scan_id"): r
+                for r in answer.get("results", [])
+                if isinstance(r, dict)
+            }
+            missing = {
+                "status": "error",
+                "message": "No result for scan",
+                "retry": True,
+            }
+            return [results.get(scan_id, missing) for scan_id, _, _ in scans]
+
+        except Exception as e:
+            # Connection errors, timeouts and anything else leave the scans queued
+            return [{"status": "error", "message": str(e), "retry": True}] * len(scans)
+
+    def fetch_roster(self, since=None):
+        """Roster changes for this station, None if the server has no roster"""
+        params = {"station_code": self.station_code}
+        if since:
+            params["since"] = since
+        try:
+            response = self.session.get(
+                f"{self.server_url}/api/roster",
+                params=params,
+                timeout=(self.connect_timeout, self.read_timeout),
+            )
+            if response.status_code != 200:
+                logging.error(f"Roster fetch failed: HTTP {response.status_code}")
+                return None
+            return response.json()
+
+        except Exception as e:
+            logging.error(f"Roster fetch failed: {e}")
+            return None
+
+    def enhance_frame(self, frame, brightness=1.0, contrast=1.0):
+        """Enhance frame quality for better scanning"""
+        # One lookup table instead of float math over every pixel
+        table = np.clip(np.arange(256) * brightness * contrast, 0, 255)
+        return cv2.LUT(frame, table.astype(np.uint8))
@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+from datetime import datetime
+
+from metrics import METRICS, LatencyWindow
+
+ACK_TIME = METRICS.histogram("socket_scan", "Scan sent on the socket until its ack")
+
+
+class SocketScanTransport:
+    """Sends scans as client events on the realtime socket and waits for acks
+
+    Each scan goes out as a client-scan event on a private channel, keyed by
+    its scan_id. The server answers with a scan.ack event carrying the same
+    scan_id and the usual /api/scan result. Scans that are not acked within
+    ack_timeout come back as None so the caller can post them over HTTP.
+    """
+
+    def __init__(self, client, station_code, channel="private-scans", ack_timeout=1.5):
+        self.client = client
+        self.station_code = station_code
+        self.channel = channel
+        self.ack_timeout = ack_timeout
+        self.lock = threading.Lock()
+        # scan_id -> [threading.Event, result]
+        self.pending = {}
+        self.sent = 0
+        self.acked = 0
+        self.timeouts = 0
+        self.unavailable = 0
+        self.latencies = LatencyWindow(ACK_TIME)
+        client.add_listener(self.handle)
+
+    def submit(self, scans):
+        """Sends (scan_id, scan_data, captured_at) scans, None where no ack came"""
+        waiters = []
+        for scan_id, scan_data, captured_at in scans:
+            waiter = [threading.Event(), None]
+            with self.lock:
+                self.pending[scan_id] = waiter
+            data = {
+                "scan_id": scan_id,
+                "scan_data": scan_data,
+                "station_code": self.station_code,
+                "scanned_at": datetime.fromtimestamp(captured_at).isoformat(),
+            }
+            if self.client.send("client-scan", data, self.channel):
+                self.sent += 1
+                waiters.append((scan_id, waiter, time.perf_counter()))
+            else:
+                self.unavailable += 1
+                waiters.append((scan_id, None, None))
+
+        # One deadline for the whole batch, the scans were sent back to back
+        deadline = time.monotonic() + self.ack_timeout
+        results = []
+        for scan_id, waiter, sent_at in waiters:
+            if waiter is not None and waiter[0].wait(
+                max(0, deadline - time.monotonic())
+            ):
+                self.acked += 1
+                self.latencies.add(time.perf_counter() - sent_at)
+                results.append(waiter[1])
+            else:
+                if waiter is not None:
+                    self.timeouts += 1
+                results.append(None)
+            with self.lock:
+                self.pending.pop(scan_id, None)
+        return results
+
+    def handle(self, event, channel, data):
+        """WebSocketClient listener, matches acks to the scans waiting for them"""
+        if event != "scan.ack" or not isinstance(data, dict):
+            return
+        with self.lock:
+            waiter = self.pending.get(data.get("scan_id"))
+        if waiter is None:
+            # Late ack for a scan that already went over HTTP
+            logging.info(f"Ack for unknown scan {data.get('scan_id')}")
+            return
+        waiter[1] = data
+        waiter[0].set()
+
+    def stats(self):
+        stats = {
+            "sent": self.sent,
+            "acked": self.acked,
+            "timeouts": self.timeouts,
+            "unavailable": self.unavailable,
+        }
+        stats.update(self.latencies.summary(digits=1))
+        return stats
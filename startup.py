@@ -0,0 +1,48 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupTimeline:
+    """Milliseconds spent per startup phase, written to the log as one line
+
+    mark() closes a phase on the GUI thread, measured from the previous mark.
+    timed() measures work running in the background alongside the GUI phases.
+    """
+
+    def __init__(self, started=None):
+        self.started = started or time.perf_counter()
+        self.last = self.started
+        self.lock = threading.Lock()
+        self.phases = []
+        self.background = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        with self.lock:
+            self.phases.append((phase, now - self.last))
+            self.last = now
+
+    @contextmanager
+    def timed(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.background.append((phase, time.perf_counter() - started))
+
+    def summary(self):
+        with self.lock:
+            foreground = ", ".join(f"{p} {s * 1000:.0f}" for p, s in self.phases)
+            background = ", ".join(f"{p} {s * 1000:.0f}" for p, s in self.background)
+            ready = (self.last - self.started) * 1000
+        total = (time.perf_counter() - self.started) * 1000
+        return (
+            f"window ready in {ready:.0f} ms ({foreground}), "
+            f"background {background or '-'}, all done in {total:.0f} ms"
+        )
+
+    def log(self):
+        logging.info(f"Startup timeline: {self.summary()}")
@@ -0,0 +1,207 @@
+"""Local stand-in for the attendance server, for trying the scanner offline
+
+Run it with ``python stub_server.py --port 8000`` and set the Server URL in
+Settings to ``http://127.0.0.1:8000``. ``--no-bulk`` turns off the bulk
+endpoint so the per-scan fallback can be exercised, ``--delay`` adds server
+latency in milliseconds. ``--ws-port 6001`` also starts a Pusher-protocol
+socket that acks client-scan events, point the Soketi settings at it with SSL
+off to try the websocket transport.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+
+class StubState:
+    def __init__(self, bulk=True, delay=0):
+        self.bulk = bulk
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests = {"single": 0, "bulk": 0, "socket": 0}
+        self.scans = 0
+        self.seen_ids = {}
+
+    def scan_result(self, scan_data, scan_id=None):
+        with self.lock:
+            # Idempotency: a scan id that was already recorded gets the same answer
+            if scan_id and scan_id in self.seen_ids:
+                return self.seen_ids[scan_id]
+            self.scans += 1
+
+            if not 4 <= len(scan_data) <= 10:
+                result = {"status": "error", "message": "Invalid scan"}
+            else:
+                result = {
+                    "status": "success",
+                    "data": {
+                        "student_name": f"Student {scan_data}",
+                        "class": "Grade 7",
+                        "scan_time": datetime.now().strftime("%H:%M:%S"),
+                        "attendance_status": "P",
+                        "scan_type": "in",
+                        "photo_url": None,
+                    },
+                }
+            if scan_id:
+                self.seen_ids[scan_id] = result
+            return result
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes, Nagle would hold the body
+    # back for the client's delayed ACK and add ~40 ms to every request
+    disable_nagle_algorithm = True
+    state = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/api/roster":
+            # A fixed roster of 100 students, nothing changes after the first sync
+            since = parse_qs(url.query).get("since")
+            students = [
+                {
+                    "qr": f"STU{i:04d}",
+                    "name": f"Student STU{i:04d}",
+                    "class": "Grade 7",
+                    "photo_url": None,
+                }
+                for i in range(100)
+            ]
+            self.send_json(
+                200,
+                {
+                    "students": [] if since else students,
+                    "removed": [],
+                    "server_time": datetime.now().isoformat(),
+                },
+            )
+        else:
+            self.send_json(404, {"status": "error", "message": "Not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode()
+        if self.state.delay:
+            time.sleep(self.state.delay / 1000)
+
+        if self.path == "/api/scan":
+            form = {k: v[0] for k, v in parse_qs(body).items()}
+            self.state.requests["single"] += 1
+            result = self.state.scan_result(
+                form.get("scan_data", ""),
+                self.headers.get("Idempotency-Key") or form.get("scan_id"),
+            )
+            self.send_json(200, result)
+        elif self.path == "/api/scan/bulk" and self.state.bulk:
+            payload = json.loads(body)
+            self.state.requests["bulk"] += 1
+            results = []
+            for scan in payload.get("scans", []):
+                result = self.state.scan_result(scan["scan_data"], scan.get("scan_id"))
+                results.append({**result, "scan_id": scan.get("scan_id")})
+            self.send_json(200, {"results": results})
+        else:
+            self.send_json(404, {"status": "error", "message": "Not found"})
+
+    def send_json(self, status, data):
+        content = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        print(
+            f"{self.address_string()} {format % args} "
+            f"requests={self.state.requests} scans={self.state.scans}"
+        )
+
+
+def serve(port=8000, bulk=True, delay=0):
+    StubHandler.state = StubState(bulk=bulk, delay=delay)
+    return ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+
+
+async def pusher_session(ws, state):
+    """Just enough of the Pusher protocol for the scanner's realtime client"""
+    socket_id = f"{random.randint(1, 10**6)}.{random.randint(1, 10**6)}"
+    await ws.send(
+        json.dumps(
+            {
+                "event": "pusher:connection_established",
+                "data": json.dumps({"socket_id": socket_id, "activity_timeout": 120}),
+            }
+        )
+    )
+    async for message in ws:
+        data = json.loads(message)
+        event = data.get("event")
+        if event == "pusher:subscribe":
+            channel = data["data"]["channel"]
+            reply = {"event": "pusher_internal:subscription_succeeded", "data": "{}"}
+            await ws.send(json.dumps({**reply, "channel": channel}))
+        elif event == "pusher:ping":
+            await ws.send(json.dumps({"event": "pusher:pong", "data": {}}))
+        elif event == "client-scan":
+            # A real server would get this through a client event webhook
+            if state.delay:
+                await asyncio.sleep(state.delay / 1000)
+            scan = data["data"]
+            state.requests["socket"] += 1
+            result = state.scan_result(scan["scan_data"], scan.get("scan_id"))
+            ack = {**result, "scan_id": scan.get("scan_id")}
+            await ws.send(
+                json.dumps(
+                    {
+                        "event": "scan.ack",
+                        "channel": data.get("channel"),
+                        "data": json.dumps(ack),
+                    }
+                )
+            )
+
+
+def serve_pusher(port, state):
+    """Runs the Pusher stand-in on a daemon thread, returns once it listens"""
+    ready = threading.Event()
+
+    async def run():
+        async with websockets.serve(
+            lambda ws: pusher_session(ws, state), "127.0.0.1", port
+        ):
+            ready.set()
+            await asyncio.Future()
+
+    threading.Thread(target=asyncio.run, args=(run(),), daemon=True).start()
+    ready.wait(5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--no-bulk", action="store_true")
+    parser.add_argument("--delay", type=int, default=0, help="latency in ms")
+    parser.add_argument("--ws-port", type=int, help="also serve the Pusher socket")
+    args = parser.parse_args()
+
+    server = serve(args.port, bulk=not args.no_bulk, delay=args.delay)
+    print(f"Stub server on http://127.0.0.1:{args.port}")
+    if args.ws_port:
+        serve_pusher(args.ws_port, StubHandler.state)
+        print(f"Pusher stand-in on ws://127.0.0.1:{args.ws_port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
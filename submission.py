@@ -0,0 +1,178 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from metrics import METRICS
+
+RESULT_TIME = METRICS.histogram("scan_to_result", "Scan queued until its result")
+QUEUE_WAIT = METRICS.histogram("submit_queue", "Scan queued until a worker took it")
+SCANS_SUCCEEDED = METRICS.counter("scans_succeeded", "Scans the server accepted")
+SCANS_FAILED = METRICS.counter("scans_failed", "Scans rejected or not delivered")
+SCANS_REJECTED = METRICS.counter("scans_rejected", "Scans the full queue turned away")
+
+
+class ScanSubmitter(QObject):
+    """Posts scans from background threads and reports results through a signal"""
+
+    result_ready = pyqtSignal(str, object)
+
+    def __init__(
+        self,
+        scanner,
+        journal=None,
+        workers=2,
+        max_pending=100,
+        batch_size=1,
+        batch_linger=0.05,
+        transport=None,
+    ):
+        super().__init__()
+        self.scanner = scanner
+        self.journal = journal
+        # Optional SocketScanTransport, scans it gets no ack for go over HTTP
+        self.transport = transport
+        self.fallbacks = 0
+        # A batch_size above 1 coalesces scans arriving within batch_linger seconds
+        self.batch_size = max(1, batch_size)
+        self.batch_linger = batch_linger
+        self.batches = 0
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.threads = []
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self.run, name=f"submit-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, timeout=2):
+        for _ in self.threads:
+            try:
+                self.queue.put(None, timeout=timeout)
+            except queue.Full:
+                break
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+        self.threads = []
+
+    def submit(self, scan_data):
+        """Queues a scan without waiting for the network, False if the queue is full"""
+        captured_at = time.time()
+        scan_id = uuid.uuid4().hex
+        if self.journal:
+            scan_id = self.journal.append(
+                scan_data, self.scanner.station_code, captured_at
+            )
+
+        try:
+            self.queue.put_nowait((scan_id, scan_data, captured_at))
+        except queue.Full:
+            self.rejected += 1
+            SCANS_REJECTED.inc()
+            if self.journal:
+                # Still journaled, the uploader sends it later
+                self.journal.mark_pending(scan_id, "Submission queue full")
+            logging.error(f"Submission queue full, scan {scan_data} not sent")
+            return False
+        self.submitted += 1
+        return True
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            items = [item]
+            stopping = self.collect_batch(items)
+            now = time.time()
+            for _, _, captured_at in items:
+                QUEUE_WAIT.observe(now - captured_at)
+            for item, result in zip(items, self.send(items)):
+                try:
+                    self.finish(item, result)
+                except Exception as e:
+                    # The scan stays journaled, the worker carries on
+                    logging.error(f"Could not finish scan {item[1]}: {e}")
+            if stopping:
+                break
+
+    def collect_batch(self, items):
+        """Adds scans arriving within the linger time, True if stop was requested"""
+        deadline = time.monotonic() + self.batch_linger
+        while len(items) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return True
+            items.append(item)
+        return False
+
+    def send(self, items):
+        if self.transport is None:
+            return self.send_http(items)
+
+        results = self.transport.submit(items)
+        missed = [i for i, result in enumerate(results) if result is None]
+        if missed:
+            self.fallbacks += len(missed)
+            # Same scan ids, so a late socket ack and the HTTP post count once
+            retried = self.send_http([items[i] for i in missed])
+            for i, result in zip(missed, retried):
+                results[i] = result
+        return results
+
+    def send_http(self, items):
+        if len(items) > 1 and self.scanner.bulk_supported is not False:
+            results = self.scanner.process_scan_batch(items)
+            if results is not None:
+                self.batches += 1
+                return results
+
+        return [
+            self.scanner.process_scan(
+                scan_data, scan_id=scan_id, captured_at=captured_at
+            )
+            for scan_id, scan_data, captured_at in items
+        ]
+
+    def finish(self, item, result):
+        scan_id, scan_data, captured_at = item
+        RESULT_TIME.observe(time.time() - captured_at)
+        if result.get("status") == "success":
+            self.completed += 1
+            SCANS_SUCCEEDED.inc()
+        else:
+            self.failed += 1
+            SCANS_FAILED.inc()
+
+        if self.journal:
+            if result.get("retry"):
+                self.journal.mark_pending(scan_id, result.get("message"))
+            else:
+                self.journal.mark_sent(scan_id)
+        self.result_ready.emit(scan_data, result)
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "fallbacks": self.fallbacks,
+            "pending": self.queue.qsize(),
+        }